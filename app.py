@@ -15,7 +15,6 @@ from framework import (
     INDICATORS, INDICATOR_DESCRIPTIONS, INDICATOR_COLOURS,
     ITEMS, OPEN_QUESTIONS_PRE, OPEN_QUESTIONS_POST, RATING_SCALE
 )
-from load_test_data import load_test_cohort, remove_test_cohort
 
 # Page configuration
 st.set_page_config(
@@ -26,7 +25,7 @@ st.set_page_config(
 )
 
 # Custom CSS for Cencora branding
-st.markdown("""
+APP_CSS = """
 <style>
     .main-header {
         color: #461E96;
@@ -58,7 +57,9 @@ st.markdown("""
         color: white;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # Initialize database
 @st.cache_resource
@@ -68,13 +69,39 @@ def get_database():
 db = get_database()
 
 
+@st.cache_resource
+def get_report_generator():
+    # Imported lazily so participant-facing pages don't load docx/matplotlib
+    from report_generator import ReportGenerator
+    return ReportGenerator(db)
+
+
+@st.cache_resource
+def get_theme_extractor():
+    from theme_extractor import ThemeExtractor
+    return ThemeExtractor()
+
+
+@st.cache_data(ttl=30)
+def load_cohorts():
+    """Cached cohort list plus its {name: id} mapping for the cohort selectors."""
+    cohorts = db.get_all_cohorts()
+    return cohorts, {c['name']: c['id'] for c in cohorts}
+
+
+@st.cache_data(ttl=60, max_entries=32)
+def load_cohort_stats():
+    """Cached {cohort_id: (total, pre_done, post_done)} for the dashboard."""
+    return db.get_cohort_stats()
+
+
 def main():
     """Main application entry point."""
     
     # Check if this is an assessment link
-    query_params = st.query_params
-    if 'token' in query_params:
-        show_assessment_form(query_params['token'])
+    token = st.query_params.get('token')
+    if token:
+        show_assessment_form(token)
         return
     
     # Otherwise show admin interface
@@ -138,22 +165,17 @@ def show_overview():
     
     st.header("Dashboard")
     
-    cohorts = db.get_all_cohorts()
+    cohorts, _ = load_cohorts()
     
     if not cohorts:
         st.info("No cohorts created yet. Go to 'Manage Cohorts' to create your first cohort.")
         return
     
     # Summary metrics
-    total_participants = 0
-    total_pre_complete = 0
-    total_post_complete = 0
-    
-    for cohort in cohorts:
-        participants = db.get_participants_for_cohort(cohort['id'])
-        total_participants += len(participants)
-        total_pre_complete += sum(1 for p in participants if p.get('pre_completed'))
-        total_post_complete += sum(1 for p in participants if p.get('post_completed'))
+    stats = load_cohort_stats()
+    total_participants = sum(s[0] for s in stats.values())
+    total_pre_complete = sum(s[1] for s in stats.values())
+    total_post_complete = sum(s[2] for s in stats.values())
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -172,18 +194,16 @@ def show_overview():
     st.subheader("Cohorts at a Glance")
     
     for cohort in cohorts:
-        participants = db.get_participants_for_cohort(cohort['id'])
-        pre_done = sum(1 for p in participants if p.get('pre_completed'))
-        post_done = sum(1 for p in participants if p.get('post_completed'))
+        total, pre_done, post_done = stats.get(cohort['id'], (0, 0, 0))
         
-        with st.expander(f"**{cohort['name']}** - {len(participants)} participants"):
+        with st.expander(f"**{cohort['name']}** - {total} participants"):
             col1, col2, col3 = st.columns(3)
             with col1:
                 st.write(f"**Programme:** {cohort.get('programme', 'Launch Readiness')}")
             with col2:
-                st.write(f"**PRE Complete:** {pre_done}/{len(participants)}")
+                st.write(f"**PRE Complete:** {pre_done}/{total}")
             with col3:
-                st.write(f"**POST Complete:** {post_done}/{len(participants)}")
+                st.write(f"**POST Complete:** {post_done}/{total}")
             
             if cohort.get('description'):
                 st.write(f"*{cohort['description']}*")
@@ -217,6 +237,7 @@ def show_cohort_management():
                     start_date=start_date.isoformat() if start_date else None,
                     end_date=end_date.isoformat() if end_date else None
                 )
+                load_cohorts.clear()
                 st.success(f"Cohort '{name}' created successfully!")
                 st.rerun()
             else:
@@ -227,14 +248,16 @@ def show_cohort_management():
     # List existing cohorts
     st.subheader("Existing Cohorts")
     
-    cohorts = db.get_all_cohorts()
+    cohorts, _ = load_cohorts()
     
     if not cohorts:
         st.info("No cohorts created yet.")
         return
     
+    participants_by_cohort = db.get_participants_for_cohorts([c['id'] for c in cohorts])
+    
     for cohort in cohorts:
-        participants = db.get_participants_for_cohort(cohort['id'])
+        participants = participants_by_cohort[cohort['id']]
         
         with st.expander(f"📁 {cohort['name']} ({len(participants)} participants)"):
             col1, col2, col3 = st.columns([2, 2, 1])
@@ -253,6 +276,8 @@ def show_cohort_management():
                     if len(participants) > 0:
                         st.warning(f"This will delete {len(participants)} participants and all their data!")
                     db.delete_cohort(cohort['id'])
+                    load_cohorts.clear()
+                    load_cohort_stats.clear()
                     st.success("Cohort deleted.")
                     st.rerun()
 
@@ -262,14 +287,13 @@ def show_participant_management():
     
     st.header("Manage Participants")
     
-    cohorts = db.get_all_cohorts()
+    cohorts, cohort_options = load_cohorts()
     
     if not cohorts:
         st.warning("Create a cohort first before adding participants.")
         return
     
     # Select cohort
-    cohort_options = {c['name']: c['id'] for c in cohorts}
     selected_cohort_name = st.selectbox("Select Cohort", options=list(cohort_options.keys()))
     selected_cohort_id = cohort_options[selected_cohort_name]
     
@@ -318,6 +342,7 @@ def show_participant_management():
                             added += 1
                         except Exception as e:
                             st.warning(f"Skipped {r['name']}: {e}")
+                    load_cohort_stats.clear()
                     st.success(f"Added {added} participants!")
                     st.rerun()
             else:
@@ -341,6 +366,7 @@ def show_participant_management():
                     email=email,
                     role=role
                 )
+                load_cohort_stats.clear()
                 st.success(f"Participant '{name}' added successfully!")
                 st.rerun()
             else:
@@ -358,7 +384,8 @@ def show_participant_management():
         return
     
     # ── Email Actions ──────────────────────────
-    from email_sender import is_email_configured, send_assessment_email, send_reminder_email
+    from email_sender import (BatchEmailLogger, assessment_url, is_email_configured, send_assessment_email,
+                              send_assessment_emails_concurrent, send_reminder_email)
     
     # Get base URL
     try:
@@ -368,7 +395,8 @@ def show_participant_management():
     if not base_url:
         base_url = "https://cencora-readiness.streamlit.app"
     
-    if is_email_configured():
+    email_configured = is_email_configured()
+    if email_configured:
         st.subheader("📧 Email Actions")
         
         # Calculate who needs what
@@ -382,12 +410,15 @@ def show_participant_management():
         with col1:
             if need_pre:
                 if st.button(f"📨 Send PRE Links ({len(need_pre)})", type="primary"):
-                    sent = 0
-                    for p in need_pre:
-                        success, msg = send_assessment_email(p, 'PRE', base_url, db)
-                        if success:
-                            sent += 1
-                        else:
+                    with st.status(f"Sending {len(need_pre)} PRE invitations...") as status:
+                        results = send_assessment_emails_concurrent(
+                            need_pre, 'PRE', base_url, db,
+                            on_result=lambda p, success, msg: status.write(f"{'✅' if success else '❌'} {p['name']}")
+                        )
+                        sent = sum(1 for _, success, _ in results if success)
+                        status.update(label=f"Sent {sent} of {len(results)} PRE invitations", state="complete")
+                    for p, success, msg in results:
+                        if not success:
                             st.warning(f"{p['name']}: {msg}")
                     st.success(f"Sent {sent} PRE assessment invitations!")
             else:
@@ -396,12 +427,15 @@ def show_participant_management():
         with col2:
             if need_post:
                 if st.button(f"📨 Send POST Links ({len(need_post)})"):
-                    sent = 0
-                    for p in need_post:
-                        success, msg = send_assessment_email(p, 'POST', base_url, db)
-                        if success:
-                            sent += 1
-                        else:
+                    with st.status(f"Sending {len(need_post)} POST invitations...") as status:
+                        results = send_assessment_emails_concurrent(
+                            need_post, 'POST', base_url, db,
+                            on_result=lambda p, success, msg: status.write(f"{'✅' if success else '❌'} {p['name']}")
+                        )
+                        sent = sum(1 for _, success, _ in results if success)
+                        status.update(label=f"Sent {sent} of {len(results)} POST invitations", state="complete")
+                    for p, success, msg in results:
+                        if not success:
                             st.warning(f"{p['name']}: {msg}")
                     st.success(f"Sent {sent} POST assessment invitations!")
             else:
@@ -412,14 +446,15 @@ def show_participant_management():
             if incomplete:
                 if st.button(f"🔔 Send Reminders ({len(incomplete)})"):
                     sent = 0
-                    for p in pre_incomplete:
-                        success, msg = send_reminder_email(p, 'PRE', base_url, db)
-                        if success:
-                            sent += 1
-                    for p in post_incomplete:
-                        success, msg = send_reminder_email(p, 'POST', base_url, db)
-                        if success:
-                            sent += 1
+                    with BatchEmailLogger(db) as logger:
+                        for p in pre_incomplete:
+                            success, msg = send_reminder_email(p, 'PRE', base_url, db, logger)
+                            if success:
+                                sent += 1
+                        for p in post_incomplete:
+                            success, msg = send_reminder_email(p, 'POST', base_url, db, logger)
+                            if success:
+                                sent += 1
                     st.success(f"Sent {sent} reminders!")
             else:
                 st.write("✅ All assessments complete")
@@ -461,7 +496,7 @@ sender_name = "The Development Catalyst"
                 if p.get('pre_completed'):
                     st.write(f"✅ Completed: {p['pre_completed'][:10]}")
                 else:
-                    pre_link = f"{base_url}?token={p['pre_token']}"
+                    pre_link = assessment_url(base_url, p['pre_token'])
                     st.code(pre_link, language=None)
                     st.caption("Share this link with the participant")
             
@@ -470,7 +505,7 @@ sender_name = "The Development Catalyst"
                 if p.get('post_completed'):
                     st.write(f"✅ Completed: {p['post_completed'][:10]}")
                 elif p.get('pre_completed'):
-                    post_link = f"{base_url}?token={p['post_token']}"
+                    post_link = assessment_url(base_url, p['post_token'])
                     st.code(post_link, language=None)
                     st.caption("Share after programme completion")
                 else:
@@ -482,10 +517,11 @@ sender_name = "The Development Catalyst"
             with col1:
                 if st.button("🗑️ Delete", key=f"del_p_{p['id']}"):
                     db.delete_participant(p['id'])
+                    load_cohort_stats.clear()
                     st.success(f"Participant '{p['name']}' deleted.")
                     st.rerun()
             with col2:
-                if is_email_configured() and p.get('email'):
+                if email_configured and p.get('email'):
                     if not p.get('pre_completed'):
                         if st.button("📨 Send PRE", key=f"send_pre_{p['id']}"):
                             success, msg = send_assessment_email(p, 'PRE', base_url, db)
@@ -507,20 +543,17 @@ def show_report_generation():
     
     st.header("Generate Reports")
     
-    # Import report generator here to avoid circular imports
-    from report_generator import ReportGenerator
     import zipfile
     
-    report_gen = ReportGenerator(db)
+    report_gen = get_report_generator()
     
-    cohorts = db.get_all_cohorts()
+    cohorts, cohort_options = load_cohorts()
     
     if not cohorts:
         st.warning("Create a cohort and add participants first.")
         return
     
     # Select cohort
-    cohort_options = {c['name']: c['id'] for c in cohorts}
     selected_cohort_name = st.selectbox("Select Cohort", options=list(cohort_options.keys()))
     selected_cohort_id = cohort_options[selected_cohort_name]
     
@@ -577,7 +610,7 @@ def show_report_generation():
                             try:
                                 doc_buffer = report_gen.generate_baseline_report(p['id'])
                                 filename = f"Readiness_Baseline_{p['name'].replace(' ', '_')}.docx"
-                                zf.writestr(filename, doc_buffer.getvalue())
+                                zf.writestr(filename, doc_buffer.getbuffer())
                                 generated += 1
                             except Exception as e:
                                 st.warning(f"Skipped {p['name']}: {e}")
@@ -638,7 +671,7 @@ def show_report_generation():
                             try:
                                 doc_buffer = report_gen.generate_progress_report(p['id'], selected_cohort_id)
                                 filename = f"Readiness_Progress_{p['name'].replace(' ', '_')}.docx"
-                                zf.writestr(filename, doc_buffer.getvalue())
+                                zf.writestr(filename, doc_buffer.getbuffer())
                                 generated += 1
                             except Exception as e:
                                 st.warning(f"Skipped {p['name']}: {e}")
@@ -707,8 +740,7 @@ def show_settings():
     # Theme extractor status
     st.subheader("AI Theme Extraction")
     
-    from theme_extractor import ThemeExtractor
-    extractor = ThemeExtractor()
+    extractor = get_theme_extractor()
     
     if extractor.is_available():
         st.success("✅ Claude API connected - AI theme extraction available")
@@ -733,6 +765,8 @@ def show_settings():
     st.divider()
     
     # ── Test Data Management ──────────────────────────
+    from load_test_data import load_test_cohort, remove_test_cohort
+    
     st.subheader("Test Data")
     st.caption("Load a synthetic cohort of 12 participants with complete PRE and POST data for testing reports. This won't affect any real participant data.")
     
@@ -741,6 +775,8 @@ def show_settings():
         if st.button("🧪 Load Test Cohort", type="primary"):
             try:
                 result = load_test_cohort(db)
+                load_cohorts.clear()
+                load_cohort_stats.clear()
                 st.success(
                     f"✅ Loaded **{result['participants']} participants** with "
                     f"**{result['ratings']} ratings** and **{result['open_responses']} open responses**.\n\n"
@@ -754,6 +790,8 @@ def show_settings():
         if st.button("🗑️ Remove Test Cohort"):
             try:
                 remove_test_cohort(db)
+                load_cohorts.clear()
+                load_cohort_stats.clear()
                 st.success("✅ Test data removed. All real participant data is untouched.")
                 st.rerun()
             except Exception as e:
@@ -765,7 +803,13 @@ def show_assessment_form(token: str):
     
     # Import the assessment form module
     from assessment_form import show_assessment
-    show_assessment(db, token)
+    
+    # Resolve the token once per session; reruns reuse the stored context
+    if st.session_state.get('_assessment_token') != token:
+        st.session_state['_assessment_token'] = token
+        st.session_state['_assessment_context'] = db.begin_assessment(token)
+    
+    show_assessment(db, token, st.session_state['_assessment_context'])
 
 
 if __name__ == "__main__":
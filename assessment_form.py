@@ -5,108 +5,232 @@ Assessment form for participants.
 Displays PRE or POST assessment based on the access token.
 """
 
+import html
+import re
+from contextlib import nullcontext
 import streamlit as st
 from framework import (
-    INDICATORS, INDICATOR_DESCRIPTIONS, INDICATOR_COLOURS,
-    ITEMS, OPEN_QUESTIONS_PRE, OPEN_QUESTIONS_POST, RATING_SCALE,
+    INDICATOR_BLOCKS, ITEM_TEXTS, OPEN_QUESTIONS_PRE, OPEN_QUESTIONS_POST, RATING_SCALE,
     get_items_for_indicator
 )
 
 
-def show_assessment(db, token: str):
-    """Display the assessment form."""
+def _compact_css(css: str) -> str:
+    """Strip comments and indentation from a <style> block (it is re-sent on every rerun)."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    return re.sub(r'\s*\n\s*', '', css).strip()
+
+
+# Styles for the assessment and completion pages (mobile friendly)
+FORM_CSS = _compact_css("""
+<style>
+    .main-title {
+        color: #461E96;
+        font-size: 1.8rem;
+        font-weight: bold;
+        margin-bottom: 0.5rem;
+    }
+    .sub-title {
+        color: #E6008C;
+        font-size: 1.1rem;
+        margin-bottom: 1.5rem;
+    }
+    .indicator-header {
+        font-size: 1.1rem;
+        font-weight: bold;
+        margin-top: 1.5rem;
+        margin-bottom: 0.5rem;
+        padding: 0.75rem;
+        border-radius: 4px;
+        color: white;
+    }
+    .indicator-description {
+        color: rgba(49, 51, 63, 0.6);
+        font-size: 0.875rem;
+        margin-bottom: 1rem;
+    }
+    .scale-legend {
+        display: grid;
+        grid-template-rows: repeat(2, auto);
+        grid-auto-flow: column;
+        gap: 0.25rem 1rem;
+        color: rgba(49, 51, 63, 0.6);
+        font-size: 0.875rem;
+    }
+    .welcome-box {
+        background-color: #F5F5F5;
+        padding: 1.2rem;
+        border-radius: 8px;
+        border-left: 4px solid #461E96;
+        margin-bottom: 1.5rem;
+        line-height: 1.6;
+    }
+    .welcome-box strong {
+        color: #461E96;
+    }
+    .question-text {
+        font-size: 0.95rem;
+        line-height: 1.4;
+        margin-bottom: 0.5rem;
+    }
+    .item-box {
+        background-color: #F5F5F5;
+        padding: 0.75rem 1rem;
+        border-radius: 6px;
+        border-left: 3px solid #461E96;
+        margin-bottom: 0.25rem;
+    }
+    /* Spacing between questions (replaces per-item spacer elements) */
+    div[data-testid="stRadio"],
+    div[data-testid="stTextArea"] {
+        margin-bottom: 1rem;
+    }
+    .warning-box {
+        background-color: #FFF3CD;
+        border: 1px solid #FFCC00;
+        border-radius: 8px;
+        padding: 1rem;
+        margin: 1rem 0;
+    }
+    /* Mobile responsive */
+    @media (max-width: 768px) {
+        .main-title { font-size: 1.4rem; }
+        .indicator-header { font-size: 1rem; padding: 0.5rem; }
+        .scale-legend { grid-template-rows: none; grid-auto-flow: row; }
+    }
+</style>
+""")
+
+COMPLETION_CSS = _compact_css("""
+<style>
+    .completion-box {
+        background-color: #E8F5E9;
+        padding: 2rem;
+        border-radius: 8px;
+        text-align: center;
+        border: 2px solid #00DC8C;
+        margin-top: 2rem;
+    }
+    .completion-box h2 {
+        color: #2E7D32;
+        margin-bottom: 1rem;
+    }
+    .completion-box p {
+        color: #3B3B3B;
+        margin-bottom: 0.5rem;
+    }
+</style>
+""")
+
+
+# Welcome messages by assessment type ({first_name} is filled in per participant)
+WELCOME_HTML = {
+    'PRE': """
+        <div class="welcome-box">
+            <p>Welcome, <strong>{first_name}</strong>!</p>
+            <p>This assessment will help you reflect on your current readiness as you prepare for your new role.
+            There are no right or wrong answers – this is simply a snapshot of where you see yourself today.</p>
+            <p>The assessment takes about <strong>10-15 minutes</strong> to complete. Please answer honestly – your responses
+            are confidential and will be used to support your development.</p>
+        </div>
+        """,
+    'POST': """
+        <div class="welcome-box">
+            <p>Welcome back, <strong>{first_name}</strong>!</p>
+            <p>Now that you've completed the Launch Readiness programme, this assessment will help capture
+            your growth and identify areas for continued development.</p>
+            <p>As before, there are no right or wrong answers. Your honest reflection will help us understand
+            the programme's impact and support your ongoing development.</p>
+        </div>
+        """,
+}
+
+# Completion messages by assessment type
+COMPLETION_HTML = {
+    'PRE': """
+        <div class="completion-box">
+            <h2>✅ Assessment Complete</h2>
+            <p>You have already completed your <strong>Pre-Programme Assessment</strong>.</p>
+            <p>Thank you for your responses. We look forward to seeing you in the programme!</p>
+            <p><em>You will receive a link to complete your Post-Programme Assessment after the programme ends.</em></p>
+        </div>
+        """,
+    'POST': """
+        <div class="completion-box">
+            <h2>✅ Assessment Complete</h2>
+            <p>You have already completed your <strong>Post-Programme Assessment</strong>.</p>
+            <p>Thank you for your participation in the Launch Readiness programme!</p>
+            <p><em>Your facilitator will share your Progress Report with you shortly.</em></p>
+        </div>
+        """,
+}
+
+# Radio options and labels ("1 – Strongly Disagree" ...), shared by every rating widget
+RATING_OPTIONS = list(RATING_SCALE)
+RATING_LABELS = {score: f"{score} – {label}" for score, label in RATING_SCALE.items()}
+
+# Rating scale legend shown above the items (1-2 / 3-4 / 5-6 in three columns)
+RATING_LEGEND_HTML = (
+    '<p><strong>Rating Scale:</strong></p><div class="scale-legend">'
+    + ''.join(f'<span>{score} = {label}</span>' for score, label in RATING_SCALE.items())
+    + '</div>'
+)
+
+# Indicator header + description HTML, one element per indicator block
+INDICATOR_HEADER_HTML = {
+    indicator: (
+        f'<div class="indicator-header" style="background-color: {colour};">{indicator}</div>'
+        f'<div class="indicator-description">{description}</div>'
+    )
+    for indicator, colour, description, _ in INDICATOR_BLOCKS
+}
+
+# Item row HTML, built once at import rather than per item on every rerun
+ITEM_HTML = {
+    item_num: f'<div class="item-box" style="border-left-color: {colour};"><strong>{item_num}.</strong> {ITEM_TEXTS[item_num]}</div>'
+    for _, colour, _, item_nums in INDICATOR_BLOCKS
+    for item_num in item_nums
+}
+ITEM_HTML.update({
+    item_num: f'<div class="item-box"><strong>{item_num}.</strong> {ITEM_TEXTS[item_num]}</div>'
+    for item_num in get_items_for_indicator('Overall')
+})
+
+
+def show_assessment(db, token: str, context: dict = None):
+    """Display the assessment form.
+    
+    `context` is the result of db.begin_assessment(token); the caller
+    keeps it in session state so reruns skip the lookup.
+    """
     
-    # Validate token
-    assessment = db.get_assessment_by_token(token)
+    # Validate token (and mark as started)
+    if context is None:
+        context = db.begin_assessment(token)
     
-    if not assessment:
+    if not context:
         st.error("Invalid or expired assessment link.")
         st.stop()
     
+    assessment = context['assessment']
+    
     # Check if already completed
     if assessment.get('completed_at'):
         show_completion_message(assessment['assessment_type'])
         return
     
     # Get participant info
-    participant = db.get_participant(assessment['participant_id'])
-    cohort = db.get_cohort(participant['cohort_id'])
-    
-    # Mark as started
-    db.mark_assessment_started(token)
+    participant = context['participant']
     
     # Determine assessment type
     is_pre = assessment['assessment_type'] == 'PRE'
     open_questions = OPEN_QUESTIONS_PRE if is_pre else OPEN_QUESTIONS_POST
     
-    # For POST assessment, get PRE responses to show concern reflection
-    pre_concern = None
-    if not is_pre:
-        assessments = db.get_assessments_for_participant(participant['id'])
-        if assessments['PRE'] and assessments['PRE'].get('completed_at'):
-            pre_responses = db.get_open_responses(assessments['PRE']['id'])
-            pre_concern = pre_responses.get(3, "")  # Question 3 was concerns
+    # For POST assessment, PRE question 3 (concerns) comes with the context
+    pre_concern = context['pre_concern']
     
     # Page styling - mobile friendly
-    st.markdown("""
-    <style>
-        .main-title {
-            color: #461E96;
-            font-size: 1.8rem;
-            font-weight: bold;
-            margin-bottom: 0.5rem;
-        }
-        .sub-title {
-            color: #E6008C;
-            font-size: 1.1rem;
-            margin-bottom: 1.5rem;
-        }
-        .indicator-header {
-            font-size: 1.1rem;
-            font-weight: bold;
-            margin-top: 1.5rem;
-            margin-bottom: 0.5rem;
-            padding: 0.75rem;
-            border-radius: 4px;
-            color: white;
-        }
-        .welcome-box {
-            background-color: #F5F5F5;
-            padding: 1.2rem;
-            border-radius: 8px;
-            border-left: 4px solid #461E96;
-            margin-bottom: 1.5rem;
-            line-height: 1.6;
-        }
-        .welcome-box strong {
-            color: #461E96;
-        }
-        .question-text {
-            font-size: 0.95rem;
-            line-height: 1.4;
-            margin-bottom: 0.5rem;
-        }
-        .item-box {
-            background-color: #F5F5F5;
-            padding: 0.75rem 1rem;
-            border-radius: 6px;
-            border-left: 3px solid #461E96;
-            margin-bottom: 0.25rem;
-        }
-        .warning-box {
-            background-color: #FFF3CD;
-            border: 1px solid #FFCC00;
-            border-radius: 8px;
-            padding: 1rem;
-            margin: 1rem 0;
-        }
-        /* Mobile responsive */
-        @media (max-width: 768px) {
-            .main-title { font-size: 1.4rem; }
-            .indicator-header { font-size: 1rem; padding: 0.5rem; }
-        }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(FORM_CSS, unsafe_allow_html=True)
     
     # Header
     assessment_title = "Pre-Programme Assessment" if is_pre else "Post-Programme Assessment"
@@ -114,28 +238,8 @@ def show_assessment(db, token: str):
     st.markdown(f'<p class="sub-title">{assessment_title}</p>', unsafe_allow_html=True)
     
     # Welcome message - using proper HTML
-    first_name = participant['name'].split()[0]
-    if is_pre:
-        welcome_html = f"""
-        <div class="welcome-box">
-            <p>Welcome, <strong>{first_name}</strong>!</p>
-            <p>This assessment will help you reflect on your current readiness as you prepare for your new role.
-            There are no right or wrong answers – this is simply a snapshot of where you see yourself today.</p>
-            <p>The assessment takes about <strong>10-15 minutes</strong> to complete. Please answer honestly – your responses
-            are confidential and will be used to support your development.</p>
-        </div>
-        """
-    else:
-        welcome_html = f"""
-        <div class="welcome-box">
-            <p>Welcome back, <strong>{first_name}</strong>!</p>
-            <p>Now that you've completed the Launch Readiness programme, this assessment will help capture
-            your growth and identify areas for continued development.</p>
-            <p>As before, there are no right or wrong answers. Your honest reflection will help us understand
-            the programme's impact and support your ongoing development.</p>
-        </div>
-        """
-    
+    first_name = html.escape(participant['name'].split(None, 1)[0])
+    welcome_html = WELCOME_HTML[assessment['assessment_type']].format(first_name=first_name)
     st.markdown(welcome_html, unsafe_allow_html=True)
     
     # Privacy notice
@@ -159,51 +263,53 @@ To exercise these rights, please contact your programme facilitator.
     
     st.divider()
     
-    # Assessment form
+    # Restore any saved progress into the widgets, once per session
+    if st.session_state.get('_draft_token') != token:
+        st.session_state['_draft_token'] = token
+        saved_ratings, saved_responses = db.get_draft(assessment['id'])
+        for item_num, score in saved_ratings.items():
+            st.session_state[f"rating_{item_num}"] = score
+        for q_num, response_text in saved_responses.items():
+            st.session_state[f"open_{q_num}"] = response_text or ""
+    
+    # Assessment form (fragment-scoped so submission only reruns the form)
+    _render_form(db, assessment, token, is_pre, open_questions, pre_concern)
+
+
+@st.fragment
+def _render_form(db, assessment, token: str, is_pre: bool, open_questions: dict, pre_concern):
+    """Render the ratings and reflections form and handle submission."""
+    
     with st.form("assessment_form"):
         ratings = {}
         
         # Rating scale reminder
-        st.markdown("**Rating Scale:**")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.caption("1 = Strongly Disagree")
-            st.caption("2 = Disagree")
-        with col2:
-            st.caption("3 = Slightly Disagree")
-            st.caption("4 = Slightly Agree")
-        with col3:
-            st.caption("5 = Agree")
-            st.caption("6 = Strongly Agree")
+        st.markdown(RATING_LEGEND_HTML, unsafe_allow_html=True)
         
         st.divider()
         
         # Loop through indicators
-        for indicator, (start, end) in INDICATORS.items():
-            colour = INDICATOR_COLOURS.get(indicator, '#461E96')
-            st.markdown(
-                f'<div class="indicator-header" style="background-color: {colour};">{indicator}</div>',
-                unsafe_allow_html=True
-            )
-            st.caption(INDICATOR_DESCRIPTIONS.get(indicator, ""))
+        for indicator, _, _, item_nums in INDICATOR_BLOCKS:
+            # Fully answered blocks (e.g. restored from saved progress) start collapsed
+            answered = all(st.session_state.get(f"rating_{item_num}") is not None for item_num in item_nums)
+            block = st.expander(f"✓ {indicator} – answered (click to review)") if answered else nullcontext()
             
-            # Items for this indicator
-            for item_num in range(start, end + 1):
-                item = ITEMS[item_num]
-                
-                st.markdown(f'<div class="item-box" style="border-left-color: {colour};"><strong>{item_num}.</strong> {item["text"]}</div>', unsafe_allow_html=True)
+            with block:
+                st.markdown(INDICATOR_HEADER_HTML[indicator], unsafe_allow_html=True)
                 
-                ratings[item_num] = st.radio(
-                    f"Rating for item {item_num}",
-                    options=[1, 2, 3, 4, 5, 6],
-                    format_func=lambda x: {1: "1 – Strongly Disagree", 2: "2 – Disagree", 3: "3 – Slightly Disagree", 4: "4 – Slightly Agree", 5: "5 – Agree", 6: "6 – Strongly Agree"}[x],
-                    index=None,
-                    key=f"rating_{item_num}",
-                    label_visibility="collapsed",
-                    horizontal=True
-                )
-                
-                st.write("")  # Spacing between questions
+                # Items for this indicator
+                for item_num in item_nums:
+                    st.markdown(ITEM_HTML[item_num], unsafe_allow_html=True)
+                    
+                    ratings[item_num] = st.radio(
+                        f"Rating for item {item_num}",
+                        options=RATING_OPTIONS,
+                        format_func=RATING_LABELS.__getitem__,
+                        index=None,
+                        key=f"rating_{item_num}",
+                        label_visibility="collapsed",
+                        horizontal=True
+                    )
             
             st.divider()
         
@@ -213,19 +319,17 @@ To exercise these rights, please contact your programme facilitator.
             unsafe_allow_html=True
         )
         
-        for item_num in [31, 32]:
-            item = ITEMS[item_num]
-            st.markdown(f'<div class="item-box"><strong>{item_num}.</strong> {item["text"]}</div>', unsafe_allow_html=True)
+        for item_num in get_items_for_indicator('Overall'):
+            st.markdown(ITEM_HTML[item_num], unsafe_allow_html=True)
             ratings[item_num] = st.radio(
                 f"Rating for item {item_num}",
-                options=[1, 2, 3, 4, 5, 6],
-                format_func=lambda x: {1: "1 – Strongly Disagree", 2: "2 – Disagree", 3: "3 – Slightly Disagree", 4: "4 – Slightly Agree", 5: "5 – Agree", 6: "6 – Strongly Agree"}[x],
+                options=RATING_OPTIONS,
+                format_func=RATING_LABELS.__getitem__,
                 index=None,
                 key=f"rating_{item_num}",
                 label_visibility="collapsed",
                 horizontal=True
             )
-            st.write("")
         
         st.divider()
         
@@ -255,21 +359,22 @@ To exercise these rights, please contact your programme facilitator.
                     placeholder="Share your thoughts...",
                     label_visibility="collapsed"
                 )
-            st.write("")
         
         st.divider()
         
-        # Submit button
+        # Submit and save-for-later buttons
         submitted = st.form_submit_button("Submit Assessment", type="primary", use_container_width=True)
+        save_progress = st.form_submit_button("Save Progress and Finish Later", use_container_width=True)
+        
+        if save_progress:
+            db.save_draft(assessment['id'], ratings, open_responses)
+            st.success("Your progress has been saved. You can return using the same link to finish.")
         
         if submitted:
             # Check for unanswered items (None = no selection made)
-            unanswered_items = [num for num, score in ratings.items() if score is None]
-            
-            if unanswered_items:
-                item_list = ""
-                for num in unanswered_items:
-                    item_list += f"  - **Item {num}:** {ITEMS[num]['text']}\n"
+            if None in ratings.values():
+                unanswered_items = [num for num, score in ratings.items() if score is None]
+                item_list = "\n".join(f"  - **Item {num}:** {ITEM_TEXTS[num]}" for num in unanswered_items)
                 
                 st.error(f"""
 ⚠️ **Please complete all items before submitting**
@@ -281,14 +386,10 @@ You have **{len(unanswered_items)}** unanswered item{'s' if len(unanswered_items
 Please scroll up and select a rating for each one.
                 """)
             else:
-                # Save ratings
-                db.save_all_ratings(assessment['id'], ratings)
-                
-                # Save open responses
-                db.save_all_open_responses(assessment['id'], open_responses)
-                
-                # Mark as completed
-                db.mark_assessment_completed(token)
+                # Save ratings and open responses, and mark as completed
+                db.finalize_submission(assessment['id'], token, ratings, open_responses)
+                # Force the stored context to reload so the completion page shows
+                st.session_state.pop('_assessment_token', None)
                 
                 st.success("Thank you! Your assessment has been submitted successfully.")
                 st.balloons()
@@ -300,44 +401,8 @@ Please scroll up and select a rating for each one.
 def show_completion_message(assessment_type: str):
     """Show message for already completed assessment."""
     
-    st.markdown("""
-    <style>
-        .completion-box {
-            background-color: #E8F5E9;
-            padding: 2rem;
-            border-radius: 8px;
-            text-align: center;
-            border: 2px solid #00DC8C;
-            margin-top: 2rem;
-        }
-        .completion-box h2 {
-            color: #2E7D32;
-            margin-bottom: 1rem;
-        }
-        .completion-box p {
-            color: #3B3B3B;
-            margin-bottom: 0.5rem;
-        }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(COMPLETION_CSS, unsafe_allow_html=True)
     
     st.markdown('<p class="main-title">🚀 Launch Readiness</p>', unsafe_allow_html=True)
     
-    if assessment_type == 'PRE':
-        st.markdown("""
-        <div class="completion-box">
-            <h2>✅ Assessment Complete</h2>
-            <p>You have already completed your <strong>Pre-Programme Assessment</strong>.</p>
-            <p>Thank you for your responses. We look forward to seeing you in the programme!</p>
-            <p><em>You will receive a link to complete your Post-Programme Assessment after the programme ends.</em></p>
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.markdown("""
-        <div class="completion-box">
-            <h2>✅ Assessment Complete</h2>
-            <p>You have already completed your <strong>Post-Programme Assessment</strong>.</p>
-            <p>Thank you for your participation in the Launch Readiness programme!</p>
-            <p><em>Your facilitator will share your Progress Report with you shortly.</em></p>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(COMPLETION_HTML[assessment_type], unsafe_allow_html=True)
@@ -6,10 +6,16 @@ Handles all data persistence using Turso (libSQL).
 """
 
 import sqlite3
-import secrets
+import base64
 import hashlib
 from datetime import datetime
 import os
+import time
+import queue
+import atexit
+import weakref
+import functools
+from contextlib import contextmanager
 
 # Try to import libsql for Turso cloud connection
 try:
@@ -18,32 +24,71 @@ try:
 except ImportError:
     USING_TURSO = False
 
+# Idle connections kept for reuse, and how long one may sit unused
+POOL_SIZE = 4
+POOL_MAX_IDLE_SECONDS = 120
+
+# How long cached cohort reporting results may be served (any write clears them sooner)
+REPORT_CACHE_TTL_SECONDS = 60
+
+# Bump whenever init_database() gains new tables, columns or indexes
+SCHEMA_VERSION = 2
+
+
+@functools.lru_cache(maxsize=1)
+def _turso_credentials() -> tuple:
+    """Resolve (url, token) for Turso once per process: Streamlit secrets, then environment."""
+    url = token = None
+    
+    # Try Streamlit secrets first
+    try:
+        import streamlit as st
+        url = st.secrets.get("turso", {}).get("url")
+        token = st.secrets.get("turso", {}).get("token")
+    except:
+        pass
+    
+    # Fall back to environment variables
+    return (url or os.environ.get("TURSO_DATABASE_URL"),
+            token or os.environ.get("TURSO_AUTH_TOKEN"))
+
+
+@functools.lru_cache(maxsize=32)
+def _update_cohort_sql(fields: tuple) -> str:
+    """Build (once per field combination) the UPDATE statement for update_cohort()."""
+    set_clause = ', '.join(f'{k} = ?' for k in fields)
+    return f'UPDATE cohorts SET {set_clause} WHERE id = ? RETURNING id'
+
 
 class Database:
+    # Databases (Turso URL or SQLite path) whose schema this process has already checked
+    _schema_initialized = set()
+    # Live instances, so one exit hook closes every pool without keeping instances alive
+    _instances = weakref.WeakSet()
+    
     def __init__(self, db_path="readiness.db"):
         self.db_path = db_path
-        self.turso_url = None
-        self.turso_token = None
+        self.turso_url, self.turso_token = _turso_credentials()
         
-        # Try Streamlit secrets first
-        try:
-            import streamlit as st
-            self.turso_url = st.secrets.get("turso", {}).get("url")
-            self.turso_token = st.secrets.get("turso", {}).get("token")
-        except:
-            pass
+        # Backend is fixed for the life of the instance (libSQL rows are plain tuples)
+        self.using_turso = bool(self.turso_url and self.turso_token and USING_TURSO)
+        
+        # Pool of (connection, released_at) pairs, most recently used first
+        self._pool = queue.LifoQueue(maxsize=POOL_SIZE)
+        Database._instances.add(self)
         
-        # Fall back to environment variables
-        if not self.turso_url:
-            self.turso_url = os.environ.get("TURSO_DATABASE_URL")
-        if not self.turso_token:
-            self.turso_token = os.environ.get("TURSO_AUTH_TOKEN")
+        # Cohort reporting results keyed by query, as (write_version, cached_at, result)
+        self._report_cache = {}
+        self._write_version = 0
         
-        self.init_database()
+        schema_key = self.turso_url if self.using_turso else self.db_path
+        if schema_key not in Database._schema_initialized:
+            self.init_database()
+            Database._schema_initialized.add(schema_key)
     
-    def get_connection(self):
-        """Get a database connection."""
-        if self.turso_url and self.turso_token and USING_TURSO:
+    def _connect(self):
+        """Open a new database connection."""
+        if self.using_turso:
             # Connect to Turso cloud database
             conn = libsql.connect(
                 database=self.turso_url,
@@ -51,147 +96,251 @@ class Database:
             )
             return conn
         else:
-            # Fall back to local SQLite
-            conn = sqlite3.connect(self.db_path)
+            # Fall back to local SQLite (pooled connections keep their prepared
+            # statement cache, so hot point queries skip re-parsing)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
             conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA mmap_size=268435456')
+            conn.execute('PRAGMA cache_size=-20000')
             return conn
     
-    def _execute(self, query, params=None):
-        """Execute a query and return the cursor."""
+    def get_connection(self):
+        """Get a database connection, reusing a pooled one if available.
+        
+        Hand it back with release_connection() when done.
+        """
+        while True:
+            try:
+                conn, released_at = self._pool.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - released_at < POOL_MAX_IDLE_SECONDS:
+                return conn
+            conn.close()
+    
+    def release_connection(self, conn):
+        """Return a connection to the pool (closing it if the pool is full)."""
+        if getattr(conn, 'in_transaction', False):
+            conn.rollback()
+        try:
+            self._pool.put_nowait((conn, time.monotonic()))
+        except queue.Full:
+            conn.close()
+    
+    def commit(self, conn):
+        """Commit a write and invalidate cached reporting results."""
+        conn.commit()
+        self._write_version += 1
+        self._report_cache.clear()
+    
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor on a pooled connection; commit on success, roll back on error.
+        
+        The connection always goes back to the pool.
+        """
         conn = self.get_connection()
-        cursor = conn.cursor()
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        return conn, cursor
+        try:
+            yield conn.cursor()
+            self.commit(conn)
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn)
+    
+    def _cached_report(self, key, loader):
+        """Return a cached reporting result, reloading it after a write or once stale."""
+        entry = self._report_cache.get(key)
+        now = time.monotonic()
+        if entry and entry[0] == self._write_version and now - entry[1] < REPORT_CACHE_TTL_SECONDS:
+            return entry[2]
+        
+        version = self._write_version
+        result = loader()
+        self._report_cache[key] = (version, now, result)
+        return result
+    
+    def close_pool(self):
+        """Close all pooled connections."""
+        while True:
+            try:
+                conn, _ = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+    
+    @classmethod
+    def _close_all_pools(cls):
+        """Close the pooled connections of every live instance (registered once, at exit)."""
+        for db in list(cls._instances):
+            db.close_pool()
+    
+    @contextmanager
+    def _query(self, query, params=None):
+        """Execute a query and yield its cursor (the connection is released even if fetching fails)."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            yield cursor
+        finally:
+            self.release_connection(conn)
     
     def _fetchall(self, query, params=None):
         """Execute a query and fetch all results as list of dicts."""
-        conn, cursor = self._execute(query, params)
-        
-        if USING_TURSO and self.turso_url and self.turso_token:
-            rows = cursor.fetchall()
-            if rows and len(rows) > 0:
-                columns = [desc[0] for desc in cursor.description]
-                result = [dict(zip(columns, row)) for row in rows]
-            else:
-                result = []
-        else:
-            result = [dict(row) for row in cursor.fetchall()]
-        
-        conn.close()
-        return result
+        with self._query(query, params) as cursor:
+            # Convert rows as they are read rather than materialising a tuple list first
+            return self._rows_to_dicts(cursor, iter(cursor.fetchone, None))
     
     def _fetchone(self, query, params=None):
         """Execute a query and fetch one result as dict."""
-        conn, cursor = self._execute(query, params)
-        row = cursor.fetchone()
-        
-        if row:
-            if USING_TURSO and self.turso_url and self.turso_token:
-                columns = [desc[0] for desc in cursor.description]
-                result = dict(zip(columns, row))
-            else:
-                result = dict(row)
-        else:
-            result = None
-        
-        conn.close()
-        return result
+        with self._query(query, params) as cursor:
+            return self._row_to_dict(cursor, cursor.fetchone())
+    
+    def _fetch_pairs(self, query, params=None):
+        """Execute a two-column query and return its rows as {first: second}."""
+        with self._query(query, params) as cursor:
+            return dict(cursor.fetchall())
+    
+    def _rows_to_dicts(self, cursor, rows) -> list:
+        """Convert fetched rows to dicts (sqlite3.Row converts directly; libSQL tuples are zipped with the column names)."""
+        if not self.using_turso:
+            return [dict(row) for row in rows]
+        columns = [desc[0] for desc in cursor.description or ()]
+        return [dict(zip(columns, row)) for row in rows]
+    
+    def _row_to_dict(self, cursor, row):
+        """Convert a fetched row to a dict (None if no row)."""
+        return self._rows_to_dicts(cursor, (row,))[0] if row else None
     
     def init_database(self):
-        """Initialize the database schema."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Cohorts table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cohorts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                programme TEXT DEFAULT 'Launch Readiness',
-                description TEXT,
-                start_date TEXT,
-                end_date TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Participants table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS participants (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                cohort_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                email TEXT,
-                role TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (cohort_id) REFERENCES cohorts (id)
-            )
-        ''')
-        
-        # Assessments table (PRE and POST)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS assessments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                participant_id INTEGER NOT NULL,
-                assessment_type TEXT NOT NULL CHECK (assessment_type IN ('PRE', 'POST')),
-                access_token TEXT UNIQUE NOT NULL,
-                started_at TEXT,
-                completed_at TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (participant_id) REFERENCES participants (id)
-            )
-        ''')
-        
-        # Ratings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS ratings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                assessment_id INTEGER NOT NULL,
-                item_number INTEGER NOT NULL,
-                score INTEGER NOT NULL CHECK (score >= 1 AND score <= 6),
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (assessment_id) REFERENCES assessments (id),
-                UNIQUE (assessment_id, item_number)
-            )
-        ''')
-        
-        # Open responses table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS open_responses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                assessment_id INTEGER NOT NULL,
-                question_number INTEGER NOT NULL,
-                response_text TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (assessment_id) REFERENCES assessments (id),
-                UNIQUE (assessment_id, question_number)
-            )
-        ''')
-        
-        # Email log table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS email_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                participant_id INTEGER NOT NULL,
-                email_type TEXT NOT NULL,
-                recipient_email TEXT NOT NULL,
-                status TEXT NOT NULL DEFAULT 'sent',
-                status_code INTEGER DEFAULT 0,
-                error_message TEXT,
-                sent_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (participant_id) REFERENCES participants (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Initialize the database schema (skipped if it is already at SCHEMA_VERSION)."""
+        with self.transaction() as cursor:
+            cursor.execute('PRAGMA user_version')
+            if cursor.fetchone()[0] >= SCHEMA_VERSION:
+                return
+            
+            # Cohorts table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS cohorts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    programme TEXT DEFAULT 'Launch Readiness',
+                    description TEXT,
+                    start_date TEXT,
+                    end_date TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Participants table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS participants (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    cohort_id INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    email TEXT,
+                    role TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    first_name TEXT,
+                    FOREIGN KEY (cohort_id) REFERENCES cohorts (id)
+                )
+            ''')
+            
+            # Assessments table (PRE and POST)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS assessments (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    participant_id INTEGER NOT NULL,
+                    assessment_type TEXT NOT NULL CHECK (assessment_type IN ('PRE', 'POST')),
+                    access_token TEXT UNIQUE NOT NULL,
+                    started_at TEXT,
+                    completed_at TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (participant_id) REFERENCES participants (id)
+                )
+            ''')
+            
+            # Ratings table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ratings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    assessment_id INTEGER NOT NULL,
+                    item_number INTEGER NOT NULL,
+                    score INTEGER NOT NULL CHECK (score >= 1 AND score <= 6),
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (assessment_id) REFERENCES assessments (id),
+                    UNIQUE (assessment_id, item_number)
+                )
+            ''')
+            
+            # Open responses table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS open_responses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    assessment_id INTEGER NOT NULL,
+                    question_number INTEGER NOT NULL,
+                    response_text TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (assessment_id) REFERENCES assessments (id),
+                    UNIQUE (assessment_id, question_number)
+                )
+            ''')
+            
+            # Email log table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS email_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    participant_id INTEGER NOT NULL,
+                    email_type TEXT NOT NULL,
+                    recipient_email TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'sent',
+                    status_code INTEGER DEFAULT 0,
+                    error_message TEXT,
+                    sent_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (participant_id) REFERENCES participants (id)
+                )
+            ''')
+            
+            # Indexes for the foreign-key lookups on the form, dashboard and reporting paths
+            # (access_token, ratings.assessment_id and open_responses.assessment_id are
+            # already indexed by their UNIQUE constraints)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_assessments_participant_type
+                ON assessments (participant_id, assessment_type, completed_at)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_participants_cohort
+                ON participants (cohort_id)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_email_log_participant
+                ON email_log (participant_id)
+            ''')
+            
+            # Version 2: first_name is stored at creation; add and backfill it on older databases
+            cursor.execute('PRAGMA table_info(participants)')
+            if 'first_name' not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute('ALTER TABLE participants ADD COLUMN first_name TEXT')
+                cursor.execute('''
+                    UPDATE participants
+                    SET first_name = CASE WHEN instr(trim(name), ' ') > 0
+                                          THEN substr(trim(name), 1, instr(trim(name), ' ') - 1)
+                                          ELSE trim(name) END
+                ''')
+            
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
     
     def get_db_info(self):
         """Get database connection info."""
-        if self.turso_url and self.turso_token and USING_TURSO:
+        if self.using_turso:
             return {
                 'type': 'Turso Cloud',
                 'url': self.turso_url,
@@ -209,14 +358,13 @@ class Database:
     def create_cohort(self, name: str, programme: str = "Launch Readiness", 
                       description: str = None, start_date: str = None, end_date: str = None) -> int:
         """Create a new cohort and return its ID."""
-        conn, cursor = self._execute(
-            '''INSERT INTO cohorts (name, programme, description, start_date, end_date)
-               VALUES (?, ?, ?, ?, ?)''',
-            (name, programme, description, start_date, end_date)
-        )
-        cohort_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self.transaction() as cursor:
+            cursor.execute(
+                '''INSERT INTO cohorts (name, programme, description, start_date, end_date)
+                   VALUES (?, ?, ?, ?, ?) RETURNING id''',
+                (name, programme, description, start_date, end_date)
+            )
+            cohort_id = cursor.fetchone()[0]
         return cohort_id
     
     def get_cohort(self, cohort_id: int) -> dict:
@@ -227,69 +375,70 @@ class Database:
         """Get all cohorts."""
         return self._fetchall('SELECT * FROM cohorts ORDER BY created_at DESC')
     
-    def update_cohort(self, cohort_id: int, **kwargs):
-        """Update cohort fields."""
+    def get_cohort_stats(self) -> dict:
+        """Get participant and completion counts per cohort as {cohort_id: (total, pre_done, post_done)}."""
+        rows = self._fetchall(
+            '''SELECT p.cohort_id,
+                      COUNT(DISTINCT p.id) as total,
+                      COUNT(DISTINCT CASE WHEN a.assessment_type = 'PRE'
+                                           AND a.completed_at IS NOT NULL THEN p.id END) as pre_done,
+                      COUNT(DISTINCT CASE WHEN a.assessment_type = 'POST'
+                                           AND a.completed_at IS NOT NULL THEN p.id END) as post_done
+               FROM participants p
+               LEFT JOIN assessments a ON a.participant_id = p.id
+               GROUP BY p.cohort_id'''
+        )
+        return {r['cohort_id']: (r['total'], r['pre_done'], r['post_done']) for r in rows}
+
+    def update_cohort(self, cohort_id: int, **kwargs) -> bool:
+        """Update cohort fields. Returns False if the cohort does not exist."""
         valid_fields = ['name', 'programme', 'description', 'start_date', 'end_date']
-        updates = {k: v for k, v in kwargs.items() if k in valid_fields}
+        fields = tuple(sorted(k for k in kwargs if k in valid_fields))
         
-        if not updates:
-            return
+        if not fields:
+            return False
         
-        set_clause = ', '.join(f'{k} = ?' for k in updates.keys())
-        values = list(updates.values()) + [cohort_id]
+        # Sorted field names give identical SQL text, so the statement cache is reused
+        values = [kwargs[k] for k in fields] + [cohort_id]
         
-        conn, cursor = self._execute(
-            f'UPDATE cohorts SET {set_clause} WHERE id = ?', values
-        )
-        conn.commit()
-        conn.close()
+        with self.transaction() as cursor:
+            cursor.execute(_update_cohort_sql(fields), values)
+            updated = cursor.fetchone() is not None
+        return updated
     
     def delete_cohort(self, cohort_id: int):
         """Delete a cohort and all related data."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Get all participants in cohort
-        cursor.execute('SELECT id FROM participants WHERE cohort_id = ?', (cohort_id,))
-        participants = cursor.fetchall()
-        
-        for p in participants:
-            p_id = p[0] if isinstance(p, tuple) else p['id']
-            # Get all assessments for participant
-            cursor.execute('SELECT id FROM assessments WHERE participant_id = ?', (p_id,))
-            assessments = cursor.fetchall()
-            
-            for a in assessments:
-                a_id = a[0] if isinstance(a, tuple) else a['id']
-                cursor.execute('DELETE FROM ratings WHERE assessment_id = ?', (a_id,))
-                cursor.execute('DELETE FROM open_responses WHERE assessment_id = ?', (a_id,))
-            
-            cursor.execute('DELETE FROM assessments WHERE participant_id = ?', (p_id,))
-            # Clean up email log for this participant
-            cursor.execute('DELETE FROM email_log WHERE participant_id = ?', (p_id,))
-        
-        cursor.execute('DELETE FROM participants WHERE cohort_id = ?', (cohort_id,))
-        cursor.execute('DELETE FROM cohorts WHERE id = ?', (cohort_id,))
-        
-        conn.commit()
-        conn.close()
+        with self.transaction() as cursor:
+            # Set-based deletes, children first, in one transaction
+            participant_ids = 'SELECT id FROM participants WHERE cohort_id = ?'
+            assessment_ids = f'SELECT id FROM assessments WHERE participant_id IN ({participant_ids})'
+            cursor.execute(f'DELETE FROM ratings WHERE assessment_id IN ({assessment_ids})', (cohort_id,))
+            cursor.execute(f'DELETE FROM open_responses WHERE assessment_id IN ({assessment_ids})', (cohort_id,))
+            cursor.execute(f'DELETE FROM assessments WHERE participant_id IN ({participant_ids})', (cohort_id,))
+            # Clean up email log for the cohort's participants
+            cursor.execute(f'DELETE FROM email_log WHERE participant_id IN ({participant_ids})', (cohort_id,))
+            cursor.execute('DELETE FROM participants WHERE cohort_id = ?', (cohort_id,))
+            cursor.execute('DELETE FROM cohorts WHERE id = ?', (cohort_id,))
     
     # =========== PARTICIPANT OPERATIONS ===========
     
     def create_participant(self, cohort_id: int, name: str, email: str = None, role: str = None) -> int:
         """Create a new participant and return their ID."""
-        conn, cursor = self._execute(
-            '''INSERT INTO participants (cohort_id, name, email, role)
-               VALUES (?, ?, ?, ?)''',
-            (cohort_id, name, email, role)
-        )
-        participant_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        # Automatically create PRE and POST assessments
-        self.create_assessment(participant_id, 'PRE')
-        self.create_assessment(participant_id, 'POST')
+        with self.transaction() as cursor:
+            cursor.execute(
+                '''INSERT INTO participants (cohort_id, name, email, role, first_name)
+                   VALUES (?, ?, ?, ?, ?) RETURNING id''',
+                (cohort_id, name, email, role, (name.split(None, 1) or [name])[0])
+            )
+            participant_id = cursor.fetchone()[0]
+            
+            # Automatically create PRE and POST assessments in the same transaction
+            cursor.executemany(
+                '''INSERT INTO assessments (participant_id, assessment_type, access_token)
+                   VALUES (?, ?, ?)''',
+                [(participant_id, assessment_type, token)
+                 for assessment_type, token in zip(('PRE', 'POST'), self._generate_tokens(2))]
+            )
         
         return participant_id
     
@@ -313,69 +462,67 @@ class Database:
     
     def get_participants_for_cohort(self, cohort_id: int) -> list:
         """Get all participants in a cohort with their assessment status."""
-        participants = self._fetchall(
-            'SELECT * FROM participants WHERE cohort_id = ? ORDER BY name',
+        return self._fetchall(
+            '''SELECT p.*,
+                      MAX(CASE WHEN a.assessment_type = 'PRE' THEN a.access_token END) as pre_token,
+                      MAX(CASE WHEN a.assessment_type = 'PRE' THEN a.completed_at END) as pre_completed,
+                      MAX(CASE WHEN a.assessment_type = 'POST' THEN a.access_token END) as post_token,
+                      MAX(CASE WHEN a.assessment_type = 'POST' THEN a.completed_at END) as post_completed
+               FROM participants p
+               LEFT JOIN assessments a ON a.participant_id = p.id
+               WHERE p.cohort_id = ?
+               GROUP BY p.id
+               ORDER BY p.name''',
             (cohort_id,)
         )
+    
+    def get_participants_for_cohorts(self, cohort_ids: list) -> dict:
+        """Get participants for several cohorts in one query as {cohort_id: [participants]}."""
+        result = {cohort_id: [] for cohort_id in cohort_ids}
+        if not cohort_ids:
+            return result
         
+        placeholders = ', '.join('?' for _ in cohort_ids)
+        participants = self._fetchall(
+            f'SELECT * FROM participants WHERE cohort_id IN ({placeholders}) ORDER BY name',
+            tuple(cohort_ids)
+        )
         for p in participants:
-            # Get PRE assessment status
-            pre = self._fetchone(
-                '''SELECT access_token, completed_at FROM assessments 
-                   WHERE participant_id = ? AND assessment_type = 'PRE' ''',
-                (p['id'],)
-            )
-            p['pre_token'] = pre['access_token'] if pre else None
-            p['pre_completed'] = pre['completed_at'] if pre else None
-            
-            # Get POST assessment status
-            post = self._fetchone(
-                '''SELECT access_token, completed_at FROM assessments 
-                   WHERE participant_id = ? AND assessment_type = 'POST' ''',
-                (p['id'],)
-            )
-            p['post_token'] = post['access_token'] if post else None
-            p['post_completed'] = post['completed_at'] if post else None
-        
-        return participants
+            result[p['cohort_id']].append(p)
+        return result
     
     def delete_participant(self, participant_id: int):
         """Delete a participant and all their data."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT id FROM assessments WHERE participant_id = ?', (participant_id,))
-        assessments = cursor.fetchall()
-        
-        for a in assessments:
-            a_id = a[0] if isinstance(a, tuple) else a['id']
-            cursor.execute('DELETE FROM ratings WHERE assessment_id = ?', (a_id,))
-            cursor.execute('DELETE FROM open_responses WHERE assessment_id = ?', (a_id,))
-        
-        cursor.execute('DELETE FROM assessments WHERE participant_id = ?', (participant_id,))
-        cursor.execute('DELETE FROM email_log WHERE participant_id = ?', (participant_id,))
-        cursor.execute('DELETE FROM participants WHERE id = ?', (participant_id,))
-        
-        conn.commit()
-        conn.close()
+        with self.transaction() as cursor:
+            assessment_ids = 'SELECT id FROM assessments WHERE participant_id = ?'
+            cursor.execute(f'DELETE FROM ratings WHERE assessment_id IN ({assessment_ids})', (participant_id,))
+            cursor.execute(f'DELETE FROM open_responses WHERE assessment_id IN ({assessment_ids})', (participant_id,))
+            cursor.execute('DELETE FROM assessments WHERE participant_id = ?', (participant_id,))
+            cursor.execute('DELETE FROM email_log WHERE participant_id = ?', (participant_id,))
+            cursor.execute('DELETE FROM participants WHERE id = ?', (participant_id,))
     
     # =========== ASSESSMENT OPERATIONS ===========
     
     def _generate_token(self) -> str:
         """Generate a unique access token."""
-        return secrets.token_urlsafe(32)
+        return self._generate_tokens(1)[0]
+    
+    def _generate_tokens(self, n: int) -> list:
+        """Generate n access tokens (same format as secrets.token_urlsafe(32)) from one urandom read."""
+        raw = os.urandom(32 * n)
+        return [base64.urlsafe_b64encode(raw[i * 32:(i + 1) * 32]).rstrip(b'=').decode('ascii')
+                for i in range(n)]
     
     def create_assessment(self, participant_id: int, assessment_type: str) -> str:
         """Create an assessment and return the access token."""
         token = self._generate_token()
         
-        conn, cursor = self._execute(
-            '''INSERT INTO assessments (participant_id, assessment_type, access_token)
-               VALUES (?, ?, ?)''',
-            (participant_id, assessment_type, token)
-        )
-        conn.commit()
-        conn.close()
+        with self.transaction() as cursor:
+            cursor.execute(
+                '''INSERT INTO assessments (participant_id, assessment_type, access_token)
+                   VALUES (?, ?, ?)''',
+                (participant_id, assessment_type, token)
+            )
         return token
     
     def get_assessment(self, assessment_id: int) -> dict:
@@ -386,6 +533,70 @@ class Database:
         """Get an assessment by access token."""
         return self._fetchone('SELECT * FROM assessments WHERE access_token = ?', (token,))
     
+    ASSESSMENT_CONTEXT_QUERY = '''
+        SELECT a.id, a.participant_id, a.assessment_type, a.access_token,
+               a.started_at, a.completed_at, a.created_at,
+               p.cohort_id, p.name AS participant_name, p.email AS participant_email,
+               p.role AS participant_role,
+               c.name AS cohort_name, c.programme AS cohort_programme,
+               (SELECT o.response_text
+                FROM open_responses o
+                JOIN assessments pre ON o.assessment_id = pre.id
+                WHERE a.assessment_type = 'POST' AND pre.participant_id = a.participant_id
+                  AND pre.assessment_type = 'PRE' AND pre.completed_at IS NOT NULL
+                  AND o.question_number = 3) AS pre_concern
+        FROM assessments a
+        JOIN participants p ON a.participant_id = p.id
+        JOIN cohorts c ON p.cohort_id = c.id
+        WHERE a.access_token = ?
+    '''
+    
+    def get_assessment_context(self, token: str) -> dict:
+        """Get an assessment with its participant, cohort and (for POST) PRE concern in a single query."""
+        return self._assessment_context(self._fetchone(self.ASSESSMENT_CONTEXT_QUERY, (token,)))
+    
+    def begin_assessment(self, token: str) -> dict:
+        """Mark an assessment as started and return its context, on one connection."""
+        with self.transaction() as cursor:
+            cursor.execute(
+                '''UPDATE assessments SET started_at = ? WHERE access_token = ? AND started_at IS NULL''',
+                (datetime.now().isoformat(), token)
+            )
+            cursor.execute(self.ASSESSMENT_CONTEXT_QUERY, (token,))
+            row = self._row_to_dict(cursor, cursor.fetchone())
+        return self._assessment_context(row)
+    
+    def _assessment_context(self, row: dict) -> dict:
+        """Split a joined context row into assessment, participant and cohort dicts."""
+        if not row:
+            return None
+        
+        return {
+            'assessment': {
+                'id': row['id'],
+                'participant_id': row['participant_id'],
+                'assessment_type': row['assessment_type'],
+                'access_token': row['access_token'],
+                'started_at': row['started_at'],
+                'completed_at': row['completed_at'],
+                'created_at': row['created_at']
+            },
+            'participant': {
+                'id': row['participant_id'],
+                'cohort_id': row['cohort_id'],
+                'name': row['participant_name'],
+                'email': row['participant_email'],
+                'role': row['participant_role']
+            },
+            'cohort': {
+                'id': row['cohort_id'],
+                'name': row['cohort_name'],
+                'programme': row['cohort_programme']
+            },
+            # PRE answer to question 3 (concerns), only set for POST assessments
+            'pre_concern': row['pre_concern']
+        }
+    
     def get_assessments_for_participant(self, participant_id: int) -> dict:
         """Get both PRE and POST assessments for a participant."""
         assessments = self._fetchall(
@@ -399,47 +610,65 @@ class Database:
     
     def mark_assessment_started(self, token: str):
         """Mark an assessment as started."""
-        conn, cursor = self._execute(
-            '''UPDATE assessments SET started_at = ? WHERE access_token = ? AND started_at IS NULL''',
-            (datetime.now().isoformat(), token)
-        )
-        conn.commit()
-        conn.close()
+        with self.transaction() as cursor:
+            cursor.execute(
+                '''UPDATE assessments SET started_at = ? WHERE access_token = ? AND started_at IS NULL''',
+                (datetime.now().isoformat(), token)
+            )
     
     def mark_assessment_completed(self, token: str):
         """Mark an assessment as completed."""
-        conn, cursor = self._execute(
-            '''UPDATE assessments SET completed_at = ? WHERE access_token = ?''',
-            (datetime.now().isoformat(), token)
+        with self.transaction() as cursor:
+            cursor.execute(
+                '''UPDATE assessments SET completed_at = ? WHERE access_token = ?''',
+                (datetime.now().isoformat(), token)
+            )
+    
+    def finalize_submission(self, assessment_id: int, token: str, ratings: dict, open_responses: dict):
+        """Save ratings and open responses and mark the assessment completed in one transaction."""
+        with self.transaction() as cursor:
+            self._upsert_ratings(cursor, assessment_id, ratings)
+            self._upsert_open_responses(cursor, assessment_id, open_responses)
+            cursor.execute(
+                '''UPDATE assessments SET completed_at = ? WHERE access_token = ?''',
+                (datetime.now().isoformat(), token)
+            )
+    
+    def save_draft(self, assessment_id: int, ratings: dict, open_responses: dict):
+        """Save in-progress answers (unanswered ratings skipped) without completing the assessment."""
+        answered = {item_number: score for item_number, score in ratings.items() if score is not None}
+        with self.transaction() as cursor:
+            self._upsert_ratings(cursor, assessment_id, answered)
+            self._upsert_open_responses(cursor, assessment_id, open_responses)
+    
+    def get_draft(self, assessment_id: int) -> tuple:
+        """Get saved answers as ({item_number: score}, {question_number: response_text}) in one query."""
+        rows = self._fetchall(
+            '''SELECT 'rating' as kind, item_number as num, score, NULL as response_text
+               FROM ratings WHERE assessment_id = ?
+               UNION ALL
+               SELECT 'open', question_number, NULL, response_text
+               FROM open_responses WHERE assessment_id = ?''',
+            (assessment_id, assessment_id)
         )
-        conn.commit()
-        conn.close()
+        ratings = {r['num']: r['score'] for r in rows if r['kind'] == 'rating'}
+        responses = {r['num']: r['response_text'] for r in rows if r['kind'] == 'open'}
+        return ratings, responses
     
     def is_assessment_completed(self, token: str) -> bool:
         """Check if an assessment is already completed."""
-        assessment = self.get_assessment_by_token(token)
-        return assessment and assessment.get('completed_at') is not None
+        with self._query(
+            'SELECT completed_at IS NOT NULL FROM assessments WHERE access_token = ?',
+            (token,)
+        ) as cursor:
+            row = cursor.fetchone()
+        return bool(row and row[0])
     
     # =========== RATING OPERATIONS ===========
     
     def save_rating(self, assessment_id: int, item_number: int, score: int):
         """Save or update a rating."""
-        conn, cursor = self._execute(
-            '''INSERT INTO ratings (assessment_id, item_number, score)
-               VALUES (?, ?, ?)
-               ON CONFLICT (assessment_id, item_number) 
-               DO UPDATE SET score = ?''',
-            (assessment_id, item_number, score, score)
-        )
-        conn.commit()
-        conn.close()
-    
-    def save_all_ratings(self, assessment_id: int, ratings: dict):
-        """Save all ratings at once. ratings = {item_number: score}"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        for item_number, score in ratings.items():
+        with self.transaction() as cursor:
             cursor.execute(
                 '''INSERT INTO ratings (assessment_id, item_number, score)
                    VALUES (?, ?, ?)
@@ -447,38 +676,38 @@ class Database:
                    DO UPDATE SET score = ?''',
                 (assessment_id, item_number, score, score)
             )
-        
-        conn.commit()
-        conn.close()
+    
+    def save_all_ratings(self, assessment_id: int, ratings: dict):
+        """Save all ratings at once. ratings = {item_number: score}"""
+        with self.transaction() as cursor:
+            self._upsert_ratings(cursor, assessment_id, ratings)
+    
+    def _upsert_ratings(self, cursor, assessment_id: int, ratings: dict):
+        """Upsert all ratings for an assessment as one multi-row statement on the given cursor."""
+        if not ratings:
+            return
+        placeholders = ', '.join('(?, ?, ?)' for _ in ratings)
+        cursor.execute(
+            f'''INSERT INTO ratings (assessment_id, item_number, score)
+               VALUES {placeholders}
+               ON CONFLICT (assessment_id, item_number) 
+               DO UPDATE SET score = excluded.score''',
+            tuple(value for item_number, score in ratings.items()
+                  for value in (assessment_id, item_number, score))
+        )
     
     def get_ratings(self, assessment_id: int) -> dict:
         """Get all ratings for an assessment as {item_number: score}."""
-        rows = self._fetchall(
+        return self._fetch_pairs(
             'SELECT item_number, score FROM ratings WHERE assessment_id = ?',
             (assessment_id,)
         )
-        return {r['item_number']: r['score'] for r in rows}
     
     # =========== OPEN RESPONSE OPERATIONS ===========
     
     def save_open_response(self, assessment_id: int, question_number: int, response_text: str):
         """Save or update an open response."""
-        conn, cursor = self._execute(
-            '''INSERT INTO open_responses (assessment_id, question_number, response_text)
-               VALUES (?, ?, ?)
-               ON CONFLICT (assessment_id, question_number) 
-               DO UPDATE SET response_text = ?''',
-            (assessment_id, question_number, response_text, response_text)
-        )
-        conn.commit()
-        conn.close()
-    
-    def save_all_open_responses(self, assessment_id: int, responses: dict):
-        """Save all open responses at once. responses = {question_number: response_text}"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        for question_number, response_text in responses.items():
+        with self.transaction() as cursor:
             cursor.execute(
                 '''INSERT INTO open_responses (assessment_id, question_number, response_text)
                    VALUES (?, ?, ?)
@@ -486,30 +715,58 @@ class Database:
                    DO UPDATE SET response_text = ?''',
                 (assessment_id, question_number, response_text, response_text)
             )
-        
-        conn.commit()
-        conn.close()
+    
+    def save_all_open_responses(self, assessment_id: int, responses: dict):
+        """Save all open responses at once. responses = {question_number: response_text}"""
+        with self.transaction() as cursor:
+            self._upsert_open_responses(cursor, assessment_id, responses)
+    
+    def _upsert_open_responses(self, cursor, assessment_id: int, responses: dict):
+        """Upsert all open responses for an assessment as one multi-row statement on the given cursor."""
+        if not responses:
+            return
+        placeholders = ', '.join('(?, ?, ?)' for _ in responses)
+        cursor.execute(
+            f'''INSERT INTO open_responses (assessment_id, question_number, response_text)
+               VALUES {placeholders}
+               ON CONFLICT (assessment_id, question_number) 
+               DO UPDATE SET response_text = excluded.response_text''',
+            tuple(value for question_number, response_text in responses.items()
+                  for value in (assessment_id, question_number, response_text))
+        )
     
     def get_open_responses(self, assessment_id: int) -> dict:
         """Get all open responses for an assessment as {question_number: response_text}."""
-        rows = self._fetchall(
+        return self._fetch_pairs(
             'SELECT question_number, response_text FROM open_responses WHERE assessment_id = ?',
             (assessment_id,)
         )
-        return {r['question_number']: r['response_text'] for r in rows}
     
     # =========== EMAIL LOG OPERATIONS ===========
     
     def log_email(self, participant_id, email_type, recipient_email,
                   status='sent', status_code=0, error_message=None):
         """Log an email send attempt."""
-        conn, cursor = self._execute(
-            '''INSERT INTO email_log (participant_id, email_type, recipient_email, status, status_code, error_message)
-               VALUES (?, ?, ?, ?, ?, ?)''',
-            (participant_id, email_type, recipient_email, status, status_code, error_message)
-        )
-        conn.commit()
-        conn.close()
+        with self.transaction() as cursor:
+            cursor.execute(
+                '''INSERT INTO email_log (participant_id, email_type, recipient_email, status, status_code, error_message)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                (participant_id, email_type, recipient_email, status, status_code, error_message)
+            )
+    
+    def log_emails(self, entries: list):
+        """Log several email send attempts in one transaction.
+        
+        entries = [(participant_id, email_type, recipient_email, status, status_code, error_message)]
+        """
+        if not entries:
+            return
+        with self.transaction() as cursor:
+            cursor.executemany(
+                '''INSERT INTO email_log (participant_id, email_type, recipient_email, status, status_code, error_message)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                entries
+            )
     
     def get_email_log(self, cohort_id=None, participant_id=None, limit=50):
         """Get email send history, optionally filtered by cohort or participant."""
@@ -584,12 +841,50 @@ class Database:
         return data
     
     def get_cohort_data(self, cohort_id: int) -> dict:
-        """Get aggregated data for a cohort."""
+        """Get aggregated data for a cohort (same per-participant shape as get_participant_data)."""
+        return self._cached_report(('cohort_data', cohort_id), lambda: self._load_cohort_data(cohort_id))
+    
+    def _load_cohort_data(self, cohort_id: int) -> dict:
+        """Load get_cohort_data() from the database."""
         cohort = self.get_cohort(cohort_id)
         if not cohort:
             return None
         
-        participants = self.get_participants_for_cohort(cohort_id)
+        participants = self._fetchall(
+            'SELECT * FROM participants WHERE cohort_id = ? ORDER BY name',
+            (cohort_id,)
+        )
+        
+        # Completed assessments, ratings and open responses for the whole cohort in bulk
+        cohort_filter = '''JOIN participants p ON a.participant_id = p.id
+               WHERE p.cohort_id = ? AND a.completed_at IS NOT NULL'''
+        assessments = self._fetchall(
+            f'SELECT a.* FROM assessments a {cohort_filter}',
+            (cohort_id,)
+        )
+        ratings = self._fetchall(
+            f'''SELECT r.assessment_id, r.item_number, r.score
+               FROM ratings r JOIN assessments a ON r.assessment_id = a.id {cohort_filter}''',
+            (cohort_id,)
+        )
+        responses = self._fetchall(
+            f'''SELECT o.assessment_id, o.question_number, o.response_text
+               FROM open_responses o JOIN assessments a ON o.assessment_id = a.id {cohort_filter}''',
+            (cohort_id,)
+        )
+        
+        completed = {}
+        for a in assessments:
+            completed[(a['participant_id'], a['assessment_type'])] = {
+                'assessment': a,
+                'ratings': {},
+                'open_responses': {}
+            }
+        by_assessment_id = {c['assessment']['id']: c for c in completed.values()}
+        for r in ratings:
+            by_assessment_id[r['assessment_id']]['ratings'][r['item_number']] = r['score']
+        for o in responses:
+            by_assessment_id[o['assessment_id']]['open_responses'][o['question_number']] = o['response_text']
         
         data = {
             'cohort': cohort,
@@ -600,28 +895,52 @@ class Database:
         }
         
         for p in participants:
-            p_data = self.get_participant_data(p['id'])
-            if p_data:
-                data['participants'].append(p_data)
-                if p_data['pre']:
-                    data['pre_completed'] += 1
-                if p_data['post']:
-                    data['post_completed'] += 1
+            p_data = {
+                'participant': p,
+                'cohort': cohort,
+                'pre': completed.get((p['id'], 'PRE')),
+                'post': completed.get((p['id'], 'POST'))
+            }
+            data['participants'].append(p_data)
+            if p_data['pre']:
+                data['pre_completed'] += 1
+            if p_data['post']:
+                data['post_completed'] += 1
         
         return data
     
     def get_cohort_averages(self, cohort_id: int, assessment_type: str = 'POST') -> dict:
         """Get average scores per item for a cohort."""
+        prefix = assessment_type.lower()
+        return {
+            item_number: {'avg': stats[f'{prefix}_avg'], 'count': stats[f'{prefix}_n']}
+            for item_number, stats in self.get_cohort_item_stats(cohort_id).items()
+            if stats[f'{prefix}_n']
+        }
+    
+    def get_cohort_item_stats(self, cohort_id: int) -> dict:
+        """Get PRE and POST average and count per item for a cohort in one scan.
+        
+        Returns {item_number: {'pre_avg', 'post_avg', 'pre_n', 'post_n'}}.
+        """
         query = '''
-            SELECT r.item_number, AVG(r.score) as avg_score, COUNT(*) as count
+            SELECT r.item_number,
+                   AVG(CASE WHEN a.assessment_type = 'PRE' THEN r.score END) as pre_avg,
+                   AVG(CASE WHEN a.assessment_type = 'POST' THEN r.score END) as post_avg,
+                   COUNT(CASE WHEN a.assessment_type = 'PRE' THEN 1 END) as pre_n,
+                   COUNT(CASE WHEN a.assessment_type = 'POST' THEN 1 END) as post_n
             FROM ratings r
             JOIN assessments a ON r.assessment_id = a.id
             JOIN participants p ON a.participant_id = p.id
-            WHERE p.cohort_id = ? AND a.assessment_type = ? AND a.completed_at IS NOT NULL
+            WHERE p.cohort_id = ? AND a.completed_at IS NOT NULL
             GROUP BY r.item_number
         '''
-        rows = self._fetchall(query, (cohort_id, assessment_type))
-        return {r['item_number']: {'avg': r['avg_score'], 'count': r['count']} for r in rows}
+        
+        def load():
+            rows = self._fetchall(query, (cohort_id,))
+            return {r.pop('item_number'): r for r in rows}
+        
+        return self._cached_report(('item_stats', cohort_id), load)
     
     def get_all_open_responses_for_cohort(self, cohort_id: int, assessment_type: str, question_number: int) -> list:
         """Get all open responses for a specific question across a cohort."""
@@ -633,4 +952,11 @@ class Database:
             WHERE p.cohort_id = ? AND a.assessment_type = ? AND o.question_number = ?
             AND a.completed_at IS NOT NULL AND o.response_text IS NOT NULL AND o.response_text != ''
         '''
-        return self._fetchall(query, (cohort_id, assessment_type, question_number))
+        return self._cached_report(
+            ('open_responses', cohort_id, assessment_type, question_number),
+            lambda: self._fetchall(query, (cohort_id, assessment_type, question_number))
+        )
+
+
+# One exit hook for all instances
+atexit.register(Database._close_all_pools)
@@ -7,15 +7,121 @@ Works with Microsoft 365 / Outlook, Gmail, or any SMTP provider.
 Tracks all sent emails in the database.
 """
 
+import os
+import random
+import logging
 import smtplib
 import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import time
+import queue
+import atexit
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from string import Template
+from typing import NamedTuple
+import base64
+from urllib.parse import quote
+from email.header import Header
+from email.utils import formataddr, make_msgid
 import streamlit as st
 
+_logger = logging.getLogger(__name__)
+
+# Streamlit secrets files (project, then user); SMTP config is re-read when either changes
+SECRETS_PATHS = (os.path.join('.streamlit', 'secrets.toml'),
+                 os.path.expanduser(os.path.join('~', '.streamlit', 'secrets.toml')))
+
+# Idle SMTP sessions kept open between sends
+SMTP_POOL_SIZE = 5
+# Idle sessions are checked with NOOP after this long, and dropped after the max
+SMTP_NOOP_AFTER_SECONDS = 30
+SMTP_MAX_IDLE_SECONDS = 240
+# Attempts per message on transient errors (disconnects and 4xx replies), with
+# exponential backoff from the base delay
+SMTP_SEND_ATTEMPTS = 3
+SMTP_RETRY_BASE_SECONDS = 0.5
+# Rendered emails kept per (name, link); bounded to roughly 2 MB of HTML
+EMAIL_RENDER_CACHE_SIZE = 512
+# Background log writer flushes after this many rows, or this long after the first queued row
+LOG_FLUSH_ROWS = 64
+LOG_FLUSH_SECONDS = 0.1
+# A failed log write is retried once after this delay; at exit the writer gets this long to drain
+LOG_RETRY_SECONDS = 1.0
+LOG_SHUTDOWN_TIMEOUT_SECONDS = 5.0
+
+# Content headers shared by every email (single-part UTF-8 HTML): raw 8bit body when the
+# server advertises 8BITMIME, base64 otherwise
+_MIME_HEADERS_8BIT = (b'MIME-Version: 1.0\r\n'
+                      b'Content-Type: text/html; charset="utf-8"\r\n'
+                      b'Content-Transfer-Encoding: 8bit\r\n')
+_MIME_HEADERS_BASE64 = (b'MIME-Version: 1.0\r\n'
+                        b'Content-Type: text/html; charset="utf-8"\r\n'
+                        b'Content-Transfer-Encoding: base64\r\n')
+
+
+@functools.lru_cache(maxsize=1)
+def _ssl_context():
+    """TLS context for SMTP, created once per process (loading the CA bundle reads from disk)."""
+    return ssl.create_default_context()
+
+
+class SmtpConfig(NamedTuple):
+    """SMTP settings from the [email] section of Streamlit secrets."""
+    smtp_server: str
+    smtp_port: int
+    username: str
+    password: str
+    sender_email: str
+    sender_name: str
+    pool_size: int = SMTP_POOL_SIZE
+    use_ssl: bool = False
+    # Provider send-rate cap in messages per second (0 = no limit), e.g. Gmail ~15, Microsoft 365 ~30
+    max_send_rate: float = 0
+    # From/Reply-To and tracking headers, identical for every email (see _static_headers)
+    static_headers: bytes = b''
+
+
+# (secrets mtime, SmtpConfig or None) and (SmtpConfig, SmtpConnectionPool), shared by all sessions
+_smtp_config_cache = None
+_smtp_pool_cache = None
+_smtp_pool_lock = threading.Lock()
+
+
+def _secrets_mtime():
+    """Latest modification time of the Streamlit secrets files (None if there are none)."""
+    mtimes = []
+    for path in SECRETS_PATHS:
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            pass
+    return max(mtimes, default=None)
+
 
 def get_smtp_config():
-    """Get SMTP configuration from Streamlit secrets."""
+    """Get SMTP configuration, parsed once and re-read only when the secrets file changes."""
+    global _smtp_config_cache
+    mtime = _secrets_mtime()
+    cached = _smtp_config_cache
+    if cached is None or cached[0] != mtime:
+        cached = _smtp_config_cache = (mtime, _load_smtp_config())
+    return cached[1]
+
+
+def reset_smtp_config():
+    """Forget the cached SMTP configuration and close the connection pool."""
+    global _smtp_config_cache, _smtp_pool_cache
+    with _smtp_pool_lock:
+        _smtp_config_cache = None
+        if _smtp_pool_cache:
+            _smtp_pool_cache[1].close_all()
+        _smtp_pool_cache = None
+
+
+def _load_smtp_config():
+    """Read SMTP configuration from Streamlit secrets."""
     try:
         email_config = st.secrets.get("email", {})
         smtp_server = email_config.get("smtp_server", "")
@@ -24,52 +130,358 @@ def get_smtp_config():
         password = email_config.get("password", "")
         sender_email = email_config.get("sender_email", username)
         sender_name = email_config.get("sender_name", "The Development Catalyst")
+        pool_size = email_config.get("pool_size", SMTP_POOL_SIZE)
+        # Implicit TLS (SMTPS); on by default for port 465
+        use_ssl = email_config.get("use_ssl", int(smtp_port) == 465)
+        max_send_rate = email_config.get("max_send_rate", 0)
         
         if smtp_server and username and password:
-            return {
-                'smtp_server': smtp_server,
-                'smtp_port': int(smtp_port),
-                'username': username,
-                'password': password,
-                'sender_email': sender_email,
-                'sender_name': sender_name
-            }
+            return SmtpConfig(
+                smtp_server=smtp_server,
+                smtp_port=int(smtp_port),
+                username=username,
+                password=password,
+                sender_email=sender_email,
+                sender_name=sender_name,
+                pool_size=int(pool_size),
+                use_ssl=bool(use_ssl),
+                max_send_rate=float(max_send_rate),
+                static_headers=_static_headers(sender_name, sender_email)
+            )
     except Exception:
         pass
     return None
 
 
+class TokenBucket:
+    """Thread-safe rate limiter: rate_per_sec tokens a second, up to burst saved up."""
+    
+    def __init__(self, rate_per_sec, burst):
+        self.rate = rate_per_sec
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take a token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SmtpConnectionPool:
+    """Keep-alive SMTP sessions, reused across sends instead of a new handshake each time.
+    
+    Take a logged-in session with acquire(), then hand it back with release(), or
+    discard() it if the server dropped it.
+    """
+    
+    def __init__(self, config: SmtpConfig):
+        self.config = config
+        # (server, released_at) pairs, most recently used first
+        self._idle = queue.LifoQueue(maxsize=config.pool_size)
+        # Shared by every worker sending through this pool
+        self.rate_limiter = TokenBucket(config.max_send_rate, config.pool_size) if config.max_send_rate > 0 else None
+        atexit.register(self.close_all)
+    
+    def connect(self):
+        """Open and log in a new SMTP session."""
+        if self.config.use_ssl:
+            # TLS from the first byte: no plaintext EHLO/STARTTLS exchange
+            server = smtplib.SMTP_SSL(self.config.smtp_server, self.config.smtp_port, context=_ssl_context())
+        else:
+            server = smtplib.SMTP(self.config.smtp_server, self.config.smtp_port)
+        try:
+            # starttls() and login() send EHLO themselves when needed, so no explicit ehlo() calls
+            if not self.config.use_ssl:
+                server.starttls(context=_ssl_context())
+            server.login(self.config.username, self.config.password)
+        except BaseException:
+            self.discard(server)
+            raise
+        return server
+    
+    def acquire(self):
+        """Get a logged-in session, reusing an idle one if it is still alive."""
+        while True:
+            try:
+                server, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self.connect()
+            idle = time.monotonic() - released_at
+            if idle < SMTP_NOOP_AFTER_SECONDS:
+                return server
+            if idle < SMTP_MAX_IDLE_SECONDS and self._is_alive(server):
+                return server
+            self.discard(server)
+    
+    def release(self, server):
+        """Return a session to the pool (closing it if the pool is full)."""
+        try:
+            self._idle.put_nowait((server, time.monotonic()))
+        except queue.Full:
+            self.discard(server)
+    
+    def discard(self, server):
+        """Close a session without returning it to the pool."""
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
+    def close_all(self):
+        """Close all idle sessions."""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self.discard(server)
+    
+    def _is_alive(self, server):
+        """Check an idle session with NOOP."""
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+
+def get_smtp_pool():
+    """Get the process-wide SMTP connection pool (None if email is not configured).
+    
+    A new pool replaces the old one when the SMTP configuration changes.
+    """
+    global _smtp_pool_cache
+    config = get_smtp_config()
+    if not config:
+        return None
+    with _smtp_pool_lock:
+        if _smtp_pool_cache is None or _smtp_pool_cache[0] != config:
+            if _smtp_pool_cache:
+                _smtp_pool_cache[1].close_all()
+            _smtp_pool_cache = (config, SmtpConnectionPool(config))
+        return _smtp_pool_cache[1]
+
+
+def _should_reconnect(error):
+    """Whether a send failed transiently: the session dropped, or a 4xx (temporary) reply."""
+    code = getattr(error, 'smtp_code', None)
+    return isinstance(error, smtplib.SMTPServerDisconnected) or (code is not None and 400 <= code < 500)
+
+
+@dataclass(frozen=True, slots=True)
+class Participant:
+    """The participant fields the email senders use (built once per recipient from a DB row)."""
+    id: int
+    name: str
+    email: str | None
+    pre_token: str
+    post_token: str
+    first_name: str
+    
+    @classmethod
+    def from_row(cls, row):
+        """Build from a participant dict as returned by Database.get_participants_for_cohort()."""
+        return cls(row['id'], row['name'], row.get('email'), row.get('pre_token'), row.get('post_token'),
+                   row.get('first_name') or row['name'].split()[0])
+    
+    def token(self, assessment_type):
+        """Access token for 'PRE' or 'POST'."""
+        return (self.pre_token, self.post_token)[assessment_type == 'POST']
+
+
+class BatchEmailLogger:
+    """Collects email log entries and writes them with one db.log_emails() call per batch.
+    
+    Has the same log_email() signature as Database, so it can be passed wherever the
+    senders log. Use as a context manager so the last partial batch is flushed.
+    """
+    
+    def __init__(self, db, batch_size=50):
+        self.db = db
+        self.batch_size = batch_size
+        self._entries = []
+    
+    def log_email(self, participant_id, email_type, recipient_email,
+                  status='sent', status_code=0, error_message=None):
+        """Queue a log entry, flushing once the batch is full."""
+        self._entries.append((participant_id, email_type, recipient_email, status, status_code, error_message))
+        if len(self._entries) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Write all queued entries."""
+        entries, self._entries = self._entries, []
+        self.db.log_emails(entries)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+
+# =========== BACKGROUND LOG WRITER ===========
+
+_log_queue = queue.Queue()
+_log_writer = None
+_log_writer_lock = threading.Lock()
+# Queued by _stop_log_writer() at exit: the writer flushes what it holds and stops
+_LOG_STOP = object()
+
+
+class QueuedEmailLogger:
+    """Hands log entries to a background writer thread so sends don't wait on the database.
+    
+    Has the same log_email() signature as Database. Entries are written in batches
+    with db.log_emails(); anything still queued is flushed at interpreter exit.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def log_email(self, participant_id, email_type, recipient_email,
+                  status='sent', status_code=0, error_message=None):
+        """Queue a log entry for the background writer."""
+        _start_log_writer()
+        _log_queue.put((self.db, (participant_id, email_type, recipient_email, status, status_code, error_message)))
+
+
+def _start_log_writer():
+    """Start the log writer thread on first use."""
+    global _log_writer
+    if _log_writer is not None:
+        return
+    with _log_writer_lock:
+        if _log_writer is None:
+            _log_writer = threading.Thread(target=_log_writer_loop, name='email-log-writer', daemon=True)
+            _log_writer.start()
+            atexit.register(_stop_log_writer)
+
+
+def _stop_log_writer():
+    """Flush queued log entries at exit, waiting at most LOG_SHUTDOWN_TIMEOUT_SECONDS."""
+    _log_queue.put(_LOG_STOP)
+    _log_writer.join(LOG_SHUTDOWN_TIMEOUT_SECONDS)
+    if _log_writer.is_alive():
+        _logger.error("Email log writer did not finish within %ss; unwritten entries are lost",
+                     LOG_SHUTDOWN_TIMEOUT_SECONDS)
+
+
+def _log_writer_loop():
+    """Drain the log queue, writing up to LOG_FLUSH_ROWS entries per database per batch."""
+    stopping = False
+    while not stopping:
+        batch = [_log_queue.get()]
+        deadline = time.monotonic() + LOG_FLUSH_SECONDS
+        while len(batch) < LOG_FLUSH_ROWS and batch[-1] is not _LOG_STOP:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_log_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        by_db = {}
+        for item in batch:
+            if item is _LOG_STOP:
+                stopping = True
+            else:
+                db, entry = item
+                by_db.setdefault(db, []).append(entry)
+        for db, entries in by_db.items():
+            _write_log_entries(db, entries)
+        
+        for _ in batch:
+            _log_queue.task_done()
+
+
+def _write_log_entries(db, entries):
+    """Write a batch of log entries, retrying once; entries that still fail are reported."""
+    try:
+        db.log_emails(entries)
+        return
+    except Exception:
+        time.sleep(LOG_RETRY_SECONDS)
+    try:
+        db.log_emails(entries)
+    except Exception:
+        _logger.exception("Could not write %d email log entries: %r", len(entries), entries)
+
+
+def _static_headers(sender_name, sender_email):
+    """Serialise the headers that are the same on every email."""
+    return (
+        f"From: {formataddr((sender_name, sender_email))}\r\n"
+        f"Reply-To: {sender_email}\r\n"
+        # Disable Brevo link tracking so assessment URLs aren't wrapped
+        "X-Mailin-Tag: readiness-assessment\r\n"
+        "X-Mailin-Track: 0\r\n"
+        "X-Mailin-Track-Links: 0\r\n"
+    ).encode('ascii')
+
+
 def is_email_configured():
     """Check if email sending is properly configured."""
     return get_smtp_config() is not None
 
 
-def _send_email(to_email, to_name, subject, html_content):
-    """Send an email via SMTP. Returns (success, message)."""
+def _send_email(to_email, to_name, subject, html_content, message_key=None):
+    """Send an email via SMTP. Returns (success, message).
+    
+    Each call gets a fresh Message-ID, reused across its retries. message_key, if given,
+    is sent as X-Readiness-Key so attempts at the same email can be traced.
+    """
     config = get_smtp_config()
     if not config:
         return False, "Email not configured"
     
-    msg = MIMEMultipart('alternative')
-    msg['From'] = f"{config['sender_name']} <{config['sender_email']}>"
-    msg['To'] = f"{to_name} <{to_email}>"
-    msg['Subject'] = subject
-    msg['Reply-To'] = config['sender_email']
-    # Disable Brevo link tracking so assessment URLs aren't wrapped
-    msg['X-Mailin-Tag'] = 'readiness-assessment'
-    msg['X-Mailin-Track'] = '0'
-    msg['X-Mailin-Track-Links'] = '0'
-    
-    msg.attach(MIMEText(html_content, 'html'))
+    pool = get_smtp_pool()
     
     try:
-        context = ssl.create_default_context()
-        with smtplib.SMTP(config['smtp_server'], config['smtp_port']) as server:
-            server.ehlo()
-            server.starttls(context=context)
-            server.ehlo()
-            server.login(config['username'], config['password'])
-            server.sendmail(config['sender_email'], to_email, msg.as_string())
+        # Headers and body are built before a session is taken, so a bad address or header
+        # fails here without costing a pooled session
+        message_id = make_msgid(domain=config.sender_email.rpartition('@')[2] or 'localhost')
+        head = _message_head(config, to_email, to_name, subject, message_id, message_key)
+        body = html_content.encode('utf-8')
+        
+        # A pooled session may have been dropped by the server; back off and retry on a fresh one
+        for attempt in range(1, SMTP_SEND_ATTEMPTS + 1):
+            server = pool.acquire() if attempt == 1 else pool.connect()
+            try:
+                eight_bit = server.has_extn('8bitmime')
+                message = _build_message(head, body, eight_bit)
+                if pool.rate_limiter:
+                    pool.rate_limiter.acquire()
+                server.sendmail(config.sender_email, to_email, message,
+                                mail_options=('BODY=8BITMIME',) if eight_bit else ())
+            except smtplib.SMTPRecipientsRefused:
+                # sendmail() has already reset the session, so it can be reused
+                pool.release(server)
+                raise
+            except (smtplib.SMTPException, OSError) as e:
+                # SMTP and socket errors may leave the session unusable
+                pool.discard(server)
+                if attempt == SMTP_SEND_ATTEMPTS or not _should_reconnect(e):
+                    raise
+                # Jitter so parallel workers hitting the same limit don't retry in lockstep
+                time.sleep(SMTP_RETRY_BASE_SECONDS * 2 ** (attempt - 1) * random.uniform(1, 1.5))
+            except Exception:
+                # A local failure says nothing about the session, so keep it
+                pool.release(server)
+                raise
+            else:
+                pool.release(server)
+                break
         
         return True, f"Sent to {to_email}"
     
@@ -81,7 +493,35 @@ def _send_email(to_email, to_name, subject, html_content):
         return False, f"Error: {e}"
 
 
-def send_assessment_email(participant, assessment_type, base_url, db):
+def _message_head(config, to_email, to_name, subject, message_id=None, message_key=None):
+    """Serialise the per-message headers (after the shared static ones) to bytes."""
+    encoded_subject = Header(subject, 'utf-8').encode(linesep='\r\n')
+    headers = (
+        f"To: {formataddr((to_name, to_email))}\r\n"
+        f"Subject: {encoded_subject}\r\n"
+    ).encode('ascii')
+    if message_id:
+        headers += f"Message-ID: {message_id}\r\n".encode('ascii')
+    if message_key:
+        headers += f"X-Readiness-Key: {message_key}\r\n".encode('ascii')
+    return config.static_headers + headers
+
+
+def _build_message(head, body, eight_bit=False):
+    """Serialise an HTML email straight to bytes for sendmail(), without the email.generator pass.
+    
+    head comes from _message_head(); body is the UTF-8 HTML. eight_bit sends the body as-is
+    (the server must support 8BITMIME); otherwise base64.
+    """
+    if eight_bit:
+        mime_headers = _MIME_HEADERS_8BIT
+    else:
+        mime_headers = _MIME_HEADERS_BASE64
+        body = base64.encodebytes(body)
+    return b''.join((head, mime_headers, b'\r\n', body.replace(b'\n', b'\r\n')))
+
+
+def send_assessment_email(participant, assessment_type, base_url, db, logger=None):
     """
     Send an assessment invitation email.
     
@@ -90,77 +530,187 @@ def send_assessment_email(participant, assessment_type, base_url, db):
         assessment_type: 'PRE' or 'POST'
         base_url: app base URL for building assessment links
         db: database instance for logging
+        logger: optional BatchEmailLogger to log through (default: background writes to db)
     
     Returns:
         (success: bool, message: str)
     """
-    if not participant.get('email'):
-        return False, f"No email address for {participant['name']}"
+    recipient = Participant.from_row(participant)
+    if not recipient.email:
+        return False, f"No email address for {recipient.name}"
+    
+    success, message = _send_assessment(recipient, assessment_type, base_url)
+    _log_send(logger or QueuedEmailLogger(db), recipient, assessment_type, success, message)
+    
+    return success, message
+
+
+# (max_workers, ThreadPoolExecutor) for SMTP sends, shared by all sessions
+_send_executor_cache = None
+_send_executor_lock = threading.Lock()
+
+
+def _get_send_executor(max_workers):
+    """Process-wide worker threads for SMTP sends, kept off Streamlit's script thread.
+    
+    Call with _send_executor_lock held. A new executor replaces the old one when the
+    pool size changes; the old one finishes the sends already queued on it.
+    """
+    global _send_executor_cache
+    if _send_executor_cache is None or _send_executor_cache[0] != max_workers:
+        if _send_executor_cache:
+            _send_executor_cache[1].shutdown(wait=False)
+        _send_executor_cache = (max_workers, ThreadPoolExecutor(max_workers=max_workers,
+                                                                thread_name_prefix='email-send'))
+    return _send_executor_cache[1]
+
+
+def submit_assessment_email(participant, assessment_type, base_url, db=None):
+    """
+    Queue an assessment invitation on the background send workers.
+    
+    If db is given the result is logged from the worker (through the background log
+    writer), so it is recorded even if the Streamlit script stops before it completes.
+    
+    Returns:
+        Future resolving to (success, message)
+    """
+    config = get_smtp_config()
+    recipient = Participant.from_row(participant)
+    with _send_executor_lock:
+        executor = _get_send_executor(config.pool_size if config else 1)
+        return executor.submit(_send_and_log, recipient, assessment_type, base_url, db)
+
+
+def _send_and_log(recipient, assessment_type, base_url, db):
+    """Worker task: send an invitation, then queue its log entry if db is given."""
+    success, message = _send_assessment(recipient, assessment_type, base_url)
+    if db is not None:
+        _log_send(QueuedEmailLogger(db), recipient, assessment_type, success, message)
+    return success, message
+
+
+def send_assessment_emails_concurrent(participants, assessment_type, base_url, db, on_result=None):
+    """
+    Send assessment invitations in parallel, one pooled SMTP session per worker.
+    
+    Sends run on the background send workers (one per pooled session, so it stays
+    within the provider's connection limit), which also log each result, so a batch
+    is fully recorded even if the script is stopped or rerun partway through.
+    on_result(participant, success, message) is called from the calling thread as
+    sends complete, e.g. to update progress in the UI.
+    
+    Returns:
+        list of (participant, success, message), in completion order
+    """
+    results = []
+    futures = {}
+    # Checked once for the batch; without a config nothing is built or queued
+    configured = is_email_configured()
+    
+    logger = QueuedEmailLogger(db)
+    for p in participants:
+        recipient = Participant.from_row(p)
+        if not recipient.email:
+            results.append((p, False, f"No email address for {recipient.name}"))
+        elif not configured:
+            _log_send(logger, recipient, assessment_type, False, "Email not configured")
+            results.append((p, False, "Email not configured"))
+        else:
+            futures[submit_assessment_email(p, assessment_type, base_url, db)] = p
+            continue
+        if on_result:
+            on_result(*results[-1])
+    
+    for future in as_completed(futures):
+        p = futures[future]
+        success, message = future.result()
+        results.append((p, success, message))
+        if on_result:
+            on_result(p, success, message)
+    
+    return results
+
+
+def _send_assessment(recipient, assessment_type, base_url):
+    """Build and send an assessment invitation to a Participant (no logging). Returns (success, message)."""
+    if not is_email_configured():
+        return False, "Email not configured"
     
     # Build the assessment link
-    token = participant['pre_token'] if assessment_type == 'PRE' else participant['post_token']
-    assessment_url = f"{base_url}?token={token}"
+    link = assessment_url(base_url, recipient.token(assessment_type))
     
     # Build the email
-    first_name = participant['name'].split()[0]
     
     if assessment_type == 'PRE':
         subject = "Launch Readiness \u2014 Your Pre-Programme Assessment"
-        html_content = _build_pre_email(first_name, participant['name'], assessment_url)
+        html_content = _build_pre_email(recipient.first_name, recipient.name, link)
     else:
         subject = "Launch Readiness \u2014 Your Post-Programme Assessment"
-        html_content = _build_post_email(first_name, participant['name'], assessment_url)
-    
-    success, message = _send_email(participant['email'], participant['name'], subject, html_content)
+        html_content = _build_post_email(recipient.first_name, recipient.name, link)
     
-    # Log the send
-    db.log_email(
-        participant_id=participant['id'],
-        email_type=assessment_type,
-        recipient_email=participant['email'],
+    return _send_email(recipient.email, recipient.name, subject, html_content,
+                       _message_key(recipient, assessment_type))
+
+
+@functools.lru_cache(maxsize=8)
+def _token_url_prefix(base_url):
+    """Link prefix for a base URL, up to and including 'token='."""
+    return base_url + ('&' if '?' in base_url else '?') + 'token='
+
+
+def assessment_url(base_url, token):
+    """Assessment link for an access token (the token is URL-encoded)."""
+    return _token_url_prefix(base_url) + quote(token, safe='')
+
+
+def _message_key(recipient, email_type):
+    """Per-day key for an email (sent as X-Readiness-Key; Message-ID stays unique per send)."""
+    return f"readiness.{recipient.id}.{email_type}.{time.strftime('%Y%m%d')}"
+
+
+def _log_send(log, recipient, email_type, success, message):
+    """Record a send attempt through log.log_email() (a Database or BatchEmailLogger)."""
+    log.log_email(
+        participant_id=recipient.id,
+        email_type=email_type,
+        recipient_email=recipient.email,
         status='sent' if success else 'failed',
         status_code=200 if success else 0,
         error_message=None if success else message
     )
-    
-    return success, message
 
 
-def send_reminder_email(participant, assessment_type, base_url, db):
-    """Send a reminder email for an incomplete assessment."""
-    if not participant.get('email'):
-        return False, f"No email address for {participant['name']}"
+def send_reminder_email(participant, assessment_type, base_url, db, logger=None):
+    """Send a reminder email for an incomplete assessment (logged through logger if given)."""
+    recipient = Participant.from_row(participant)
+    if not recipient.email:
+        return False, f"No email address for {recipient.name}"
     
-    token = participant['pre_token'] if assessment_type == 'PRE' else participant['post_token']
-    assessment_url = f"{base_url}?token={token}"
-    first_name = participant['name'].split()[0]
-    
-    if assessment_type == 'PRE':
-        subject = "Reminder \u2014 Your Pre-Programme Assessment"
+    if not is_email_configured():
+        success, message = False, "Email not configured"
     else:
-        subject = "Reminder \u2014 Your Post-Programme Assessment"
-    
-    html_content = _build_reminder_email(first_name, participant['name'], assessment_url, assessment_type)
-    
-    success, message = _send_email(participant['email'], participant['name'], subject, html_content)
+        link = assessment_url(base_url, recipient.token(assessment_type))
+        
+        if assessment_type == 'PRE':
+            subject = "Reminder \u2014 Your Pre-Programme Assessment"
+        else:
+            subject = "Reminder \u2014 Your Post-Programme Assessment"
+        
+        html_content = _build_reminder_email(recipient.first_name, recipient.name, link, assessment_type)
+        
+        success, message = _send_email(recipient.email, recipient.name, subject, html_content,
+                                       _message_key(recipient, f'{assessment_type}_REMINDER'))
     
-    db.log_email(
-        participant_id=participant['id'],
-        email_type=f'{assessment_type}_REMINDER',
-        recipient_email=participant['email'],
-        status='sent' if success else 'failed',
-        status_code=200 if success else 0,
-        error_message=None if success else message
-    )
+    _log_send(logger or QueuedEmailLogger(db), recipient, f'{assessment_type}_REMINDER', success, message)
     
     return success, message
 
 
 # =========== EMAIL TEMPLATES ===========
 
-def _build_pre_email(first_name, full_name, assessment_url):
-    """Build branded PRE assessment invitation email."""
-    return f"""
+# Built once at import; shared chrome is only substituted where it varies by email type
+_HEADER_HTML = Template("""
     <!DOCTYPE html>
     <html>
     <head>
@@ -177,32 +727,22 @@ def _build_pre_email(first_name, full_name, assessment_url):
                         <tr>
                             <td style="background-color:#461E96; padding:30px 40px; text-align:center;">
                                 <h1 style="color:#FFFFFF; margin:0; font-size:22px; font-weight:bold;">THE READINESS FRAMEWORK</h1>
-                                <p style="color:#E6008C; margin:8px 0 0; font-size:14px;">Pre-Programme Assessment</p>
+                                <p style="color:$accent; margin:8px 0 0; font-size:14px;">$subtitle</p>
                             </td>
                         </tr>
                         
                         <!-- Body -->
                         <tr>
                             <td style="padding:30px 40px;">
-                                <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
-                                    Hi {first_name},
-                                </p>
-                                <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
-                                    Welcome to the Launch Readiness programme. Before we begin, we'd like you to complete 
-                                    a short self-assessment. This takes about 10 minutes and helps us understand where 
-                                    you see yourself today.
-                                </p>
-                                <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
-                                    There are no right or wrong answers — this is simply a snapshot of your starting point. 
-                                    Your responses are confidential and will be used to create your personal development report.
-                                </p>
-                                
+""")
+
+_CTA_HTML = Template("""                                
                                 <!-- CTA Button -->
                                 <table width="100%" cellpadding="0" cellspacing="0" style="margin:25px 0;">
                                     <tr>
                                         <td align="center">
-                                            <a href="{assessment_url}" 
-                                               style="background-color:#461E96; color:#FFFFFF; padding:14px 40px; 
+                                            <a href="$assessment_url" 
+                                               style="background-color:$button_colour; color:#FFFFFF; padding:14px 40px; 
                                                       text-decoration:none; border-radius:6px; font-size:16px; 
                                                       font-weight:bold; display:inline-block;">
                                                 Complete Your Assessment
@@ -213,9 +753,11 @@ def _build_pre_email(first_name, full_name, assessment_url):
                                 
                                 <p style="color:#6E6E6E; font-size:13px; line-height:1.5; margin:15px 0 0;">
                                     If the button doesn't work, copy and paste this link into your browser:<br>
-                                    <a href="{assessment_url}" style="color:#461E96; word-break:break-all;">{assessment_url}</a>
+                                    <a href="$assessment_url" style="color:#461E96; word-break:break-all;">$assessment_url</a>
                                 </p>
-                            </td>
+""")
+
+_FOOTER_HTML = """                            </td>
                         </tr>
                         
                         <!-- Footer -->
@@ -238,35 +780,24 @@ def _build_pre_email(first_name, full_name, assessment_url):
     </html>
     """
 
-
-def _build_post_email(first_name, full_name, assessment_url):
-    """Build branded POST assessment invitation email."""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin:0; padding:0; background-color:#F5F5F5; font-family:Arial, sans-serif;">
-        <table width="100%" cellpadding="0" cellspacing="0" style="background-color:#F5F5F5; padding:20px 0;">
-            <tr>
-                <td align="center">
-                    <table width="600" cellpadding="0" cellspacing="0" style="background-color:#FFFFFF; border-radius:8px; overflow:hidden;">
-                        
-                        <!-- Header -->
-                        <tr>
-                            <td style="background-color:#461E96; padding:30px 40px; text-align:center;">
-                                <h1 style="color:#FFFFFF; margin:0; font-size:22px; font-weight:bold;">THE READINESS FRAMEWORK</h1>
-                                <p style="color:#00DC8C; margin:8px 0 0; font-size:14px;">Post-Programme Assessment</p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Body -->
-                        <tr>
-                            <td style="padding:30px 40px;">
+_PRE_HEADER = _HEADER_HTML.substitute(accent="#E6008C", subtitle="Pre-Programme Assessment")
+_PRE_BODY = Template("""                                <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
+                                    Hi $first_name,
+                                </p>
                                 <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
-                                    Hi {first_name},
+                                    Welcome to the Launch Readiness programme. Before we begin, we'd like you to complete 
+                                    a short self-assessment. This takes about 10 minutes and helps us understand where 
+                                    you see yourself today.
+                                </p>
+                                <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
+                                    There are no right or wrong answers — this is simply a snapshot of your starting point. 
+                                    Your responses are confidential and will be used to create your personal development report.
+                                </p>
+""")
+
+_POST_HEADER = _HEADER_HTML.substitute(accent="#00DC8C", subtitle="Post-Programme Assessment")
+_POST_BODY = Template("""                                <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
+                                    Hi $first_name,
                                 </p>
                                 <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
                                     Congratulations on completing the Launch Readiness programme! We'd now like you to 
@@ -277,122 +808,46 @@ def _build_post_email(first_name, full_name, assessment_url):
                                     takeaways and what you'll commit to doing differently. Your responses will be used 
                                     to create your personal progress report.
                                 </p>
-                                
-                                <!-- CTA Button -->
-                                <table width="100%" cellpadding="0" cellspacing="0" style="margin:25px 0;">
-                                    <tr>
-                                        <td align="center">
-                                            <a href="{assessment_url}" 
-                                               style="background-color:#007F50; color:#FFFFFF; padding:14px 40px; 
-                                                      text-decoration:none; border-radius:6px; font-size:16px; 
-                                                      font-weight:bold; display:inline-block;">
-                                                Complete Your Assessment
-                                            </a>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <p style="color:#6E6E6E; font-size:13px; line-height:1.5; margin:15px 0 0;">
-                                    If the button doesn't work, copy and paste this link into your browser:<br>
-                                    <a href="{assessment_url}" style="color:#461E96; word-break:break-all;">{assessment_url}</a>
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Footer -->
-                        <tr>
-                            <td style="background-color:#F5F5F5; padding:20px 40px; text-align:center; border-top:1px solid #E8E8E8;">
-                                <p style="color:#6E6E6E; font-size:11px; margin:0;">
-                                    This assessment is delivered by The Development Catalyst on behalf of Cencora.
+""")
+
+_REMINDER_HEADER = _HEADER_HTML.substitute(accent="#FFA400", subtitle="Friendly Reminder")
+_REMINDER_BODY = Template("""                                <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
+                                    Hi $first_name,
                                 </p>
-                                <p style="color:#6E6E6E; font-size:11px; margin:5px 0 0;">
-                                    Your responses are confidential.
+                                <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
+                                    Just a quick reminder that your $stage assessment is still waiting for you. 
+                                    It only takes about 10 minutes and your input is really valuable.
                                 </p>
-                            </td>
-                        </tr>
-                        
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
+""")
 
+# Both reminder variants, with the stage wording already filled in
+_REMINDER_BODIES = {
+    assessment_type: Template(_REMINDER_BODY.safe_substitute(stage=stage))
+    for assessment_type, stage in (('PRE', 'pre-programme'), ('POST', 'post-programme'))
+}
 
+
+def _cta_html(assessment_url, button_colour):
+    """CTA button plus plain-link fallback."""
+    return _CTA_HTML.substitute(assessment_url=assessment_url, button_colour=button_colour)
+
+
+@functools.lru_cache(maxsize=EMAIL_RENDER_CACHE_SIZE)
+def _build_pre_email(first_name, full_name, assessment_url):
+    """Build branded PRE assessment invitation email."""
+    return ''.join((_PRE_HEADER, _PRE_BODY.substitute(first_name=first_name),
+                    _cta_html(assessment_url, '#461E96'), _FOOTER_HTML))
+
+
+@functools.lru_cache(maxsize=EMAIL_RENDER_CACHE_SIZE)
+def _build_post_email(first_name, full_name, assessment_url):
+    """Build branded POST assessment invitation email."""
+    return ''.join((_POST_HEADER, _POST_BODY.substitute(first_name=first_name),
+                    _cta_html(assessment_url, '#007F50'), _FOOTER_HTML))
+
+
+@functools.lru_cache(maxsize=EMAIL_RENDER_CACHE_SIZE)
 def _build_reminder_email(first_name, full_name, assessment_url, assessment_type):
     """Build a reminder email."""
-    stage = "pre-programme" if assessment_type == "PRE" else "post-programme"
-    
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    </head>
-    <body style="margin:0; padding:0; background-color:#F5F5F5; font-family:Arial, sans-serif;">
-        <table width="100%" cellpadding="0" cellspacing="0" style="background-color:#F5F5F5; padding:20px 0;">
-            <tr>
-                <td align="center">
-                    <table width="600" cellpadding="0" cellspacing="0" style="background-color:#FFFFFF; border-radius:8px; overflow:hidden;">
-                        
-                        <!-- Header -->
-                        <tr>
-                            <td style="background-color:#461E96; padding:30px 40px; text-align:center;">
-                                <h1 style="color:#FFFFFF; margin:0; font-size:22px; font-weight:bold;">THE READINESS FRAMEWORK</h1>
-                                <p style="color:#FFA400; margin:8px 0 0; font-size:14px;">Friendly Reminder</p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Body -->
-                        <tr>
-                            <td style="padding:30px 40px;">
-                                <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
-                                    Hi {first_name},
-                                </p>
-                                <p style="color:#3B3B3B; font-size:15px; line-height:1.6; margin:0 0 15px;">
-                                    Just a quick reminder that your {stage} assessment is still waiting for you. 
-                                    It only takes about 10 minutes and your input is really valuable.
-                                </p>
-                                
-                                <!-- CTA Button -->
-                                <table width="100%" cellpadding="0" cellspacing="0" style="margin:25px 0;">
-                                    <tr>
-                                        <td align="center">
-                                            <a href="{assessment_url}" 
-                                               style="background-color:#461E96; color:#FFFFFF; padding:14px 40px; 
-                                                      text-decoration:none; border-radius:6px; font-size:16px; 
-                                                      font-weight:bold; display:inline-block;">
-                                                Complete Your Assessment
-                                            </a>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <p style="color:#6E6E6E; font-size:13px; line-height:1.5; margin:15px 0 0;">
-                                    If the button doesn't work, copy and paste this link into your browser:<br>
-                                    <a href="{assessment_url}" style="color:#461E96; word-break:break-all;">{assessment_url}</a>
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Footer -->
-                        <tr>
-                            <td style="background-color:#F5F5F5; padding:20px 40px; text-align:center; border-top:1px solid #E8E8E8;">
-                                <p style="color:#6E6E6E; font-size:11px; margin:0;">
-                                    This assessment is delivered by The Development Catalyst on behalf of Cencora.
-                                </p>
-                                <p style="color:#6E6E6E; font-size:11px; margin:5px 0 0;">
-                                    Your responses are confidential.
-                                </p>
-                            </td>
-                        </tr>
-                        
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
+    return ''.join((_REMINDER_HEADER, _REMINDER_BODIES[assessment_type].substitute(first_name=first_name),
+                    _cta_html(assessment_url, '#461E96'), _FOOTER_HTML))
@@ -42,6 +42,13 @@ INDICATOR_COLOURS = {
     'Team Readiness': '#00DC8C'        # Green
 }
 
+# Indicator blocks in display order: (indicator, colour, description, item numbers)
+INDICATOR_BLOCKS = tuple(
+    (indicator, INDICATOR_COLOURS.get(indicator, '#461E96'),
+     INDICATOR_DESCRIPTIONS.get(indicator, ""), tuple(range(start, end + 1)))
+    for indicator, (start, end) in INDICATORS.items()
+)
+
 # Focus tags - what each item measures
 FOCUS_TAGS = {
     'Knowledge': "Understanding of concepts, processes and frameworks",
@@ -223,6 +230,18 @@ ITEMS = {
     },
 }
 
+# Item statements, focus tags and indicators indexed by item number (index 0 unused)
+ITEM_TEXTS = tuple(ITEMS[i]['text'] if i in ITEMS else "" for i in range(max(ITEMS) + 1))
+ITEM_FOCUSES = tuple(ITEMS[i]['focus'] if i in ITEMS else None for i in range(max(ITEMS) + 1))
+ITEM_INDICATORS = tuple(ITEMS[i]['indicator'] if i in ITEMS else None for i in range(max(ITEMS) + 1))
+
+# Item numbers and item counts per focus tag
+_ITEMS_BY_FOCUS = {
+    focus: tuple(num for num, item_focus in enumerate(ITEM_FOCUSES) if item_focus == focus)
+    for focus in FOCUS_TAGS
+}
+_FOCUS_SUMMARY = {focus: len(nums) for focus, nums in _ITEMS_BY_FOCUS.items()}
+
 # Open questions for PRE assessment
 OPEN_QUESTIONS_PRE = {
     1: "What aspect of your new role are you most looking forward to?",
@@ -238,8 +257,8 @@ OPEN_QUESTIONS_POST = {
 }
 
 
-def get_indicator_for_item(item_num: int) -> str:
-    """Get the indicator name for a given item number."""
+def _find_indicator(item_num: int) -> str:
+    """Indicator for an item number from the INDICATORS and OVERALL_ITEMS ranges."""
     for indicator, (start, end) in INDICATORS.items():
         if start <= item_num <= end:
             return indicator
@@ -248,24 +267,34 @@ def get_indicator_for_item(item_num: int) -> str:
     return None
 
 
-def get_items_for_indicator(indicator: str) -> list:
+# Indicator name by item number, built once from the ranges (index 0 unused)
+_INDICATOR_BY_ITEM = tuple(_find_indicator(num) for num in range(max(ITEMS) + 1))
+
+
+def get_indicator_for_item(item_num: int) -> str:
+    """Get the indicator name for a given item number."""
+    if 0 <= item_num < len(_INDICATOR_BY_ITEM):
+        return _INDICATOR_BY_ITEM[item_num]
+    return None
+
+
+# Item numbers per indicator, including 'Overall'
+_ITEMS_FOR_INDICATOR = {
+    indicator: tuple(range(start, end + 1))
+    for indicator, (start, end) in (*INDICATORS.items(), ('Overall', OVERALL_ITEMS))
+}
+
+
+def get_items_for_indicator(indicator: str) -> tuple:
     """Get all item numbers for a given indicator."""
-    if indicator == 'Overall':
-        return list(range(OVERALL_ITEMS[0], OVERALL_ITEMS[1] + 1))
-    if indicator in INDICATORS:
-        start, end = INDICATORS[indicator]
-        return list(range(start, end + 1))
-    return []
+    return _ITEMS_FOR_INDICATOR.get(indicator, ())
 
 
-def get_items_by_focus(focus: str) -> list:
+def get_items_by_focus(focus: str) -> tuple:
     """Get all item numbers with a given focus tag."""
-    return [num for num, item in ITEMS.items() if item['focus'] == focus]
+    return _ITEMS_BY_FOCUS.get(focus, ())
 
 
 def get_focus_summary() -> dict:
     """Get count of items per focus tag."""
-    summary = {focus: 0 for focus in FOCUS_TAGS}
-    for item in ITEMS.values():
-        summary[item['focus']] += 1
-    return summary
+    return _FOCUS_SUMMARY.copy()
@@ -13,6 +13,26 @@ import random
 import secrets
 from datetime import datetime, timedelta
 
+# Name the test cohort is created under (and found by for removal)
+TEST_COHORT_NAME = "Test Cohort - Wave 1"
+
+
+def _placeholders(rows, columns):
+    """VALUES placeholders for a multi-row insert, e.g. '(?, ?), (?, ?)'."""
+    return ", ".join(["(" + ", ".join("?" * columns) + ")"] * rows)
+
+
+def _purge_test_cohort(cursor):
+    """Delete the test cohort and everything under it with set-based deletes, children first."""
+    participant_ids = "SELECT p.id FROM participants p JOIN cohorts c ON p.cohort_id = c.id WHERE c.name = ?"
+    assessment_ids = f"SELECT id FROM assessments WHERE participant_id IN ({participant_ids})"
+    cursor.execute(f"DELETE FROM ratings WHERE assessment_id IN ({assessment_ids})", (TEST_COHORT_NAME,))
+    cursor.execute(f"DELETE FROM open_responses WHERE assessment_id IN ({assessment_ids})", (TEST_COHORT_NAME,))
+    cursor.execute(f"DELETE FROM assessments WHERE participant_id IN ({participant_ids})", (TEST_COHORT_NAME,))
+    cursor.execute(f"DELETE FROM email_log WHERE participant_id IN ({participant_ids})", (TEST_COHORT_NAME,))
+    cursor.execute("DELETE FROM participants WHERE cohort_id IN (SELECT id FROM cohorts WHERE name = ?)", (TEST_COHORT_NAME,))
+    cursor.execute("DELETE FROM cohorts WHERE name = ?", (TEST_COHORT_NAME,))
+
 
 def load_test_cohort(db):
     """Load a complete test cohort with PRE and POST data."""
@@ -245,123 +265,100 @@ def load_test_cohort(db):
             score += growth + random.gauss(0, 0.4)
         return max(1, min(6, round(score)))
     
-    # ── Remove any previous test data ──
-    # We tag test cohorts with a recognisable name
-    
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    # Find and delete any existing test cohort
-    cursor.execute("SELECT id FROM cohorts WHERE name = 'Test Cohort - Wave 1'")
-    existing = cursor.fetchall()
-    for row in existing:
-        cohort_id_to_delete = row[0] if isinstance(row, (list, tuple)) else row['id']
-        # Get participants
-        cursor.execute("SELECT id FROM participants WHERE cohort_id = ?", (cohort_id_to_delete,))
-        old_participants = cursor.fetchall()
-        for op in old_participants:
-            op_id = op[0] if isinstance(op, (list, tuple)) else op['id']
-            # Get assessments
-            cursor.execute("SELECT id FROM assessments WHERE participant_id = ?", (op_id,))
-            old_assessments = cursor.fetchall()
-            for oa in old_assessments:
-                oa_id = oa[0] if isinstance(oa, (list, tuple)) else oa['id']
-                cursor.execute("DELETE FROM ratings WHERE assessment_id = ?", (oa_id,))
-                cursor.execute("DELETE FROM open_responses WHERE assessment_id = ?", (oa_id,))
-            cursor.execute("DELETE FROM assessments WHERE participant_id = ?", (op_id,))
-        cursor.execute("DELETE FROM participants WHERE cohort_id = ?", (cohort_id_to_delete,))
-        cursor.execute("DELETE FROM cohorts WHERE id = ?", (cohort_id_to_delete,))
-    conn.commit()
-    
-    # ── Create cohort (AUTOINCREMENT id) ──
-    
-    cursor.execute(
-        "INSERT INTO cohorts (name, programme, description, start_date, end_date) VALUES (?, ?, ?, ?, ?)",
-        ("Test Cohort - Wave 1", "Launch Readiness", "Synthetic test data for report testing",
-         PRE_DATE.strftime("%Y-%m-%d"), POST_DATE.strftime("%Y-%m-%d"))
-    )
-    conn.commit()
-    cohort_id = cursor.lastrowid
-    
-    # ── Create participants, assessments, ratings and responses ──
-    
-    ratings_count = 0
-    responses_count = 0
-    
-    for p in participants:
-        name = p["name"]
-        profile = profiles[name]
+    # Everything below, including the purge, runs in one transaction with a single commit
+    with db.transaction() as cursor:
+        # ── Remove any previous test data ──
+        # We tag test cohorts with a recognisable name
+        _purge_test_cohort(cursor)
+        
+        # ── Create cohort (AUTOINCREMENT id) ──
         
-        # Create participant (AUTOINCREMENT id)
         cursor.execute(
-            "INSERT INTO participants (cohort_id, name, email, role) VALUES (?, ?, ?, ?)",
-            (cohort_id, p["name"], p["email"], p["role"])
+            "INSERT INTO cohorts (name, programme, description, start_date, end_date) VALUES (?, ?, ?, ?, ?) RETURNING id",
+            (TEST_COHORT_NAME, "Launch Readiness", "Synthetic test data for report testing",
+             PRE_DATE.strftime("%Y-%m-%d"), POST_DATE.strftime("%Y-%m-%d"))
         )
-        conn.commit()
-        participant_id = cursor.lastrowid
+        cohort_id = cursor.fetchone()[0]
+        
+        # ── Create participants, assessments, ratings and responses ──
+        # Rows are generated per participant (keeping the seeded random sequence), then
+        # inserted with one statement per table
         
-        # Create PRE assessment
-        pre_token = secrets.token_urlsafe(32)
-        pre_ts = (PRE_DATE + timedelta(hours=random.randint(9, 17), minutes=random.randint(0, 59))).isoformat()
+        participant_rows = []
+        assessment_rows = []
+        ratings_by_participant = []
+        
+        for p in participants:
+            name = p["name"]
+            profile = profiles[name]
+            
+            participant_rows.append((cohort_id, name, p["email"], p["role"], name.split()[0]))
+            
+            # PRE and POST assessments
+            pre_ts = (PRE_DATE + timedelta(hours=random.randint(9, 17), minutes=random.randint(0, 59))).isoformat()
+            post_ts = (POST_DATE + timedelta(hours=random.randint(9, 17), minutes=random.randint(0, 59))).isoformat()
+            assessment_rows.append((name, 'PRE', secrets.token_urlsafe(32), pre_ts, pre_ts))
+            assessment_rows.append((name, 'POST', secrets.token_urlsafe(32), post_ts, post_ts))
+            
+            # Scores for all 32 items
+            scores = []
+            for item_num in range(1, 33):
+                indicator = item_indicators[item_num]
+                focus = item_focus[item_num]
+                base = profile["pre"][indicator]
+                growth = profile["growth"][indicator]
+                
+                pre_score = gen_score(base, focus)
+                post_score = gen_score(base, focus, is_post=True, growth=growth)
+                if post_score - pre_score > 3:
+                    post_score = pre_score + 3
+                scores.append((item_num, pre_score, post_score))
+            ratings_by_participant.append((name, scores))
+        
+        # Multi-row inserts hand the new ids back via RETURNING (matched on the returned
+        # columns, since RETURNING row order is not guaranteed)
         cursor.execute(
-            "INSERT INTO assessments (participant_id, assessment_type, access_token, started_at, completed_at) VALUES (?, 'PRE', ?, ?, ?)",
-            (participant_id, pre_token, pre_ts, pre_ts)
+            "INSERT INTO participants (cohort_id, name, email, role, first_name) VALUES "
+            + _placeholders(len(participant_rows), 5) + " RETURNING id, name",
+            [value for row in participant_rows for value in row]
         )
-        conn.commit()
-        pre_assessment_id = cursor.lastrowid
+        participant_ids = {row[1]: row[0] for row in cursor.fetchall()}
         
-        # Create POST assessment
-        post_token = secrets.token_urlsafe(32)
-        post_ts = (POST_DATE + timedelta(hours=random.randint(9, 17), minutes=random.randint(0, 59))).isoformat()
         cursor.execute(
-            "INSERT INTO assessments (participant_id, assessment_type, access_token, started_at, completed_at) VALUES (?, 'POST', ?, ?, ?)",
-            (participant_id, post_token, post_ts, post_ts)
+            "INSERT INTO assessments (participant_id, assessment_type, access_token, started_at, completed_at) VALUES "
+            + _placeholders(len(assessment_rows), 5) + " RETURNING id, participant_id, assessment_type",
+            [value for name, *rest in assessment_rows for value in (participant_ids[name], *rest)]
         )
-        conn.commit()
-        post_assessment_id = cursor.lastrowid
-        
-        # Generate and insert ratings for all 32 items
-        for item_num in range(1, 33):
-            indicator = item_indicators[item_num]
-            focus = item_focus[item_num]
-            base = profile["pre"][indicator]
-            growth = profile["growth"][indicator]
-            
-            pre_score = gen_score(base, focus)
-            post_score = gen_score(base, focus, is_post=True, growth=growth)
-            if post_score - pre_score > 3:
-                post_score = pre_score + 3
-            
-            cursor.execute(
-                "INSERT INTO ratings (assessment_id, item_number, score) VALUES (?, ?, ?)",
-                (pre_assessment_id, item_num, pre_score)
-            )
-            cursor.execute(
-                "INSERT INTO ratings (assessment_id, item_number, score) VALUES (?, ?, ?)",
-                (post_assessment_id, item_num, post_score)
-            )
-            ratings_count += 2
+        participant_names = {participant_id: name for name, participant_id in participant_ids.items()}
+        assessment_ids = {(participant_names[row[1]], row[2]): row[0] for row in cursor.fetchall()}
         
-        # Insert open responses
-        for q_num, response in enumerate(pre_responses[name], 1):
-            cursor.execute(
-                "INSERT INTO open_responses (assessment_id, question_number, response_text) VALUES (?, ?, ?)",
-                (pre_assessment_id, q_num, response)
-            )
-            responses_count += 1
+        rating_rows = []
+        for name, scores in ratings_by_participant:
+            pre_assessment_id = assessment_ids[(name, 'PRE')]
+            post_assessment_id = assessment_ids[(name, 'POST')]
+            for item_num, pre_score, post_score in scores:
+                rating_rows.append((pre_assessment_id, item_num, pre_score))
+                rating_rows.append((post_assessment_id, item_num, post_score))
+        cursor.executemany(
+            "INSERT INTO ratings (assessment_id, item_number, score) VALUES (?, ?, ?)",
+            rating_rows
+        )
         
-        for q_num, response in enumerate(post_responses[name], 1):
-            cursor.execute(
-                "INSERT INTO open_responses (assessment_id, question_number, response_text) VALUES (?, ?, ?)",
-                (post_assessment_id, q_num, response)
-            )
-            responses_count += 1
-    
-    conn.commit()
-    conn.close()
+        response_rows = [
+            (assessment_ids[(name, assessment_type)], q_num, response)
+            for assessment_type, responses_by_name in (('PRE', pre_responses), ('POST', post_responses))
+            for name in participant_ids
+            for q_num, response in enumerate(responses_by_name[name], 1)
+        ]
+        cursor.executemany(
+            "INSERT INTO open_responses (assessment_id, question_number, response_text) VALUES (?, ?, ?)",
+            response_rows
+        )
+        ratings_count = len(rating_rows)
+        responses_count = len(response_rows)
     
     return {
-        "cohort": "Test Cohort - Wave 1",
+        "cohort": TEST_COHORT_NAME,
         "participants": len(participants),
         "ratings": ratings_count,
         "open_responses": responses_count,
@@ -372,28 +369,6 @@ def load_test_cohort(db):
 
 def remove_test_cohort(db):
     """Remove the test cohort and all related data."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT id FROM cohorts WHERE name = 'Test Cohort - Wave 1'")
-    cohorts = cursor.fetchall()
-    
-    for row in cohorts:
-        cohort_id = row[0] if isinstance(row, (list, tuple)) else row['id']
-        cursor.execute("SELECT id FROM participants WHERE cohort_id = ?", (cohort_id,))
-        parts = cursor.fetchall()
-        for p in parts:
-            p_id = p[0] if isinstance(p, (list, tuple)) else p['id']
-            cursor.execute("SELECT id FROM assessments WHERE participant_id = ?", (p_id,))
-            assmnts = cursor.fetchall()
-            for a in assmnts:
-                a_id = a[0] if isinstance(a, (list, tuple)) else a['id']
-                cursor.execute("DELETE FROM ratings WHERE assessment_id = ?", (a_id,))
-                cursor.execute("DELETE FROM open_responses WHERE assessment_id = ?", (a_id,))
-            cursor.execute("DELETE FROM assessments WHERE participant_id = ?", (p_id,))
-        cursor.execute("DELETE FROM participants WHERE cohort_id = ?", (cohort_id,))
-        cursor.execute("DELETE FROM cohorts WHERE id = ?", (cohort_id,))
-    
-    conn.commit()
-    conn.close()
+    with db.transaction() as cursor:
+        _purge_test_cohort(cursor)
     return True
@@ -1441,9 +1441,10 @@ class ReportGenerator:
         
         n_complete = len(complete_participants)
         
-        # Calculate cohort averages
-        pre_avgs = self.db.get_cohort_averages(cohort_id, 'PRE')
-        post_avgs = self.db.get_cohort_averages(cohort_id, 'POST')
+        # Calculate cohort averages (PRE and POST from a single aggregate query)
+        item_stats = self.db.get_cohort_item_stats(cohort_id)
+        pre_avgs = {i: {'avg': s['pre_avg']} for i, s in item_stats.items() if s['pre_n']}
+        post_avgs = {i: {'avg': s['post_avg']} for i, s in item_stats.items() if s['post_n']}
         
         pre_indicator_scores = {}
         post_indicator_scores = {}